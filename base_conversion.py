@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Base Conversion - Subquadratic Digits of Huge Integers in Bases 2-36
+Divide and conquer over a cached base^(2^k) power table, with Newton
+reciprocals so every split is a multiplication rather than a long division
+"""
+
+import math
+from decimal import Decimal, localcontext
+
+DIGITS = b'0123456789abcdefghijklmnopqrstuvwxyz'
+
+# Chunks of at most 2^LEAF_LEVEL digits are written out digit by digit
+LEAF_LEVEL = 5
+
+# ============================================================================
+# POWER TABLE
+# ============================================================================
+
+class PowerTable:
+    """
+    powers[k] = base^(2^k), with Barrett reciprocals for the split levels
+    reciprocals[k] = floor(4^m / powers[k]) for m = powers[k].bit_length(),
+    each obtained from the previous level by squaring plus Newton steps -
+    no long division beyond the smallest levels. Powers grow on demand,
+    reciprocals are only computed for levels that actually get split.
+    """
+
+    def __init__(self, base):
+        if not 2 <= base <= 36:
+            raise ValueError("base must be between 2 and 36")
+        self.base = base
+        self.powers = [base]
+        self.reciprocals = [None]
+        # Two-digit strings (and raw digit values), so leaves peel digits off in pairs
+        self.pairs = [bytes((DIGITS[i // base], DIGITS[i % base])) for i in range(base * base)]
+        self.value_pairs = [bytes((i // base, i % base)) for i in range(base * base)]
+
+    def reciprocal(self, k):
+        """floor(4^m / base^(2^k)), m its bit length - computed on first use"""
+        if self.reciprocals[k] is None:
+            self.reciprocals[k] = self._reciprocal(k)
+        return self.reciprocals[k]
+
+    def _reciprocal(self, k):
+        power = self.powers[k]
+        m = power.bit_length()
+        if k <= LEAF_LEVEL:
+            return (1 << (2 * m)) // power
+
+        # 1/P_k = (1/P_{k-1})^2: square the previous reciprocal, rescale,
+        # then Newton x <- x + x (4^m - P x) / 4^m doubles the correct bits
+        previous = self.reciprocal(k - 1)
+        shift = 4 * self.powers[k - 1].bit_length() - 2 * m
+        x = previous * previous >> shift if shift >= 0 else previous * previous << -shift
+        one = 1 << (2 * m)
+        for _ in range(4):
+            step = x * (one - power * x) >> (2 * m)
+            x += step
+            if abs(step) <= 2:
+                break
+        while power * x > one:
+            x -= 1
+        while power * (x + 1) <= one:
+            x += 1
+        return x
+
+    def extend(self, k):
+        """Make sure powers[0..k] exist"""
+        while len(self.powers) <= k:
+            self.powers.append(self.powers[-1] * self.powers[-1])
+            self.reciprocals.append(None)
+
+    def level_for(self, num):
+        """Smallest k with num < base^(2^(k+1)), i.e. num fits in 2^(k+1) digits"""
+        k = 0
+        while True:
+            self.extend(k + 1)
+            if num < self.powers[k + 1]:
+                return k
+            k += 1
+
+    def divmod(self, num, k):
+        """divmod(num, base^(2^k)) for num < base^(2^(k+1)) via the reciprocal"""
+        power = self.powers[k]
+        m = power.bit_length()
+        q = num * self.reciprocal(k) >> (2 * m)
+        r = num - q * power
+        while r >= power:
+            q += 1
+            r -= power
+        return q, r
+
+_tables = {}
+
+def power_table(base):
+    """Shared PowerTable for base"""
+    if base not in _tables:
+        _tables[base] = PowerTable(base)
+    return _tables[base]
+
+# ============================================================================
+# CONVERSION
+# ============================================================================
+
+def _write_leaf(buffer, end, num, k, square, pairs, zeros):
+    if zeros is None:
+        while num:
+            num, pair = divmod(num, square)
+            buffer[end - 2:end] = pairs[pair]
+            end -= 2
+        return
+    for _ in range(1 << k):
+        num, pair = divmod(num, square)
+        buffer[end - 2:end] = pairs[pair]
+        end -= 2
+
+def _write(buffer, end, num, k, table, pairs, zeros=None):
+    """
+    Write num < base^(2^(k+1)) right-aligned into buffer[end - 2^(k+1):end]
+    With zeros (a zero-filled view) every digit is written, so a reused
+    buffer needs no clearing; otherwise zero chunks are skipped.
+    """
+    if num == 0:
+        if zeros is not None:
+            buffer[end - (2 << k):end] = zeros[:2 << k]
+        return
+    if k < LEAF_LEVEL:
+        _write_leaf(buffer, end, num, k, table.base * table.base, pairs, zeros)
+        return
+    high, low = table.divmod(num, k)
+    _write(buffer, end, low, k - 1, table, pairs, zeros)
+    _write(buffer, end - (1 << k), high, k - 1, table, pairs, zeros)
+
+def to_base(num, base):
+    """
+    Digits of num in base 2-36 as a string (lowercase letters above 9)
+    Power-of-two bases use Python's linear-time formatting; other bases
+    split num recursively at base^(2^k) into a preallocated buffer.
+    """
+    if num < 0:
+        return '-' + to_base(-num, base)
+    if num == 0:
+        return "0"
+    if base == 2:
+        return format(num, 'b')
+    if base == 8:
+        return format(num, 'o')
+    if base == 16:
+        return format(num, 'x')
+    if base in (4, 32):
+        bits = 2 if base == 4 else 5
+        binary = format(num, 'b')
+        binary = binary.zfill(-(-len(binary) // bits) * bits)
+        return bytes(DIGITS[int(binary[i:i + bits], 2)]
+                     for i in range(0, len(binary), bits)).decode('ascii')
+
+    table = power_table(base)
+    k = table.level_for(num)
+    size = 1 << (k + 1)
+    buffer = bytearray(b'0') * size
+    _write(buffer, size, num, k, table, table.pairs)
+    return buffer.lstrip(b'0').decode('ascii')
+
+# ============================================================================
+# LENGTH AND PREFIX ORACLE
+# ============================================================================
+
+def digit_count(num, base):
+    """
+    Exact number of base-b digits of num, without converting it
+    log_b(num) is estimated from the top 64 bits and bit_length; only when
+    it lands within rounding distance of an integer is the boundary
+    settled exactly against a power of the base.
+    """
+    if num < 0:
+        num = -num
+    if num == 0:
+        return 1
+    bits = num.bit_length()
+    if base & (base - 1) == 0:
+        width = base.bit_length() - 1
+        return -(-bits // width)
+
+    shift = max(bits - 64, 0)
+    log = (math.log2(num >> shift) + shift) / math.log2(base)
+    count = math.floor(log) + 1
+    if abs(log - round(log)) > 1e-12 * log + 1e-9:
+        return count
+
+    # Tie: num is within rounding of base^k - compare exactly
+    count = round(log)
+    return count + 1 if num >= base ** count else count
+
+def leading_digits(num, base, count):
+    """
+    First count digits of num in base b, converting only its top bits
+    num / b^e (e = digit_count - count) is taken as t * 2^s / b^e with
+    t the top bits of num and 2^s / b^e from high-precision logarithms;
+    one exact comparison settles the rare case where the result sits on
+    a digit boundary.
+    """
+    if num < 0:
+        return '-' + leading_digits(-num, base, count)
+    total = digit_count(num, base)
+    if total <= count + 16:
+        return to_base(num, base)[:count]
+
+    exponent = total - count
+    keep = int(count * math.log2(base)) + 96
+    shift = max(num.bit_length() - keep, 0)
+    top = num >> shift
+    with localcontext() as ctx:
+        ctx.prec = int(count * math.log10(base)) + 40 + len(str(shift + exponent))
+        scale = (shift * Decimal(2).ln() - exponent * Decimal(base).ln()).exp()
+        value = top * scale
+    head = int(value)
+    fraction = value - head
+    if not Decimal('1e-20') < fraction < 1 - Decimal('1e-20'):
+        # Next to an integer h: num >= h * b^e decides between h and h - 1
+        head = int(value.to_integral_value())
+        if num < head * base ** exponent:
+            head -= 1
+    return to_base(head, base)
+
+def representation(num, base, width=70):
+    """(digit count, first width digits) of num in base b - a cheap preview"""
+    return digit_count(num, base), leading_digits(num, base, width)
+
+# ============================================================================
+# BATCH CONVERSION
+# ============================================================================
+
+_DIGIT_VALUES = bytes.maketrans(DIGITS, bytes(range(len(DIGITS))))
+
+def to_base_batch(nums, bases):
+    """
+    Packed digits of many integers in several bases: {base: [bytes, ...]}
+    Each bytes object holds one digit value (0..base-1) per byte, most
+    significant first. Numbers are grouped by size class (the power-table
+    level they split at): each group shares the base's cached powers and
+    reciprocals and one scratch buffer, instead of allocating per number.
+    """
+    nums = list(nums)
+    result = {}
+    for base in bases:
+        packed = [None] * len(nums)
+        if base & (base - 1) == 0:
+            # Powers of two: linear-time formatting, then characters -> values
+            for i, num in enumerate(nums):
+                packed[i] = to_base(num, base).encode('ascii').translate(_DIGIT_VALUES)
+            result[base] = packed
+            continue
+
+        table = power_table(base)
+        size_classes = {}
+        for i, num in enumerate(nums):
+            size_classes.setdefault(table.level_for(num) if num else 0, []).append(i)
+        for k, indices in size_classes.items():
+            size = 1 << (k + 1)
+            buffer = bytearray(size)
+            zeros = memoryview(bytes(size))
+            for i in indices:
+                _write(buffer, size, nums[i], k, table, table.value_pairs, zeros)
+                packed[i] = bytes(buffer).lstrip(b'\0') or b'\0'
+        result[base] = packed
+    return result
+
+def digit_string(packed):
+    """Packed digit values back to the usual digit characters"""
+    return packed.translate(bytes.maketrans(bytes(range(len(DIGITS))), DIGITS)).decode('ascii')
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def _naive_to_base(num, base):
+    if num == 0:
+        return "0"
+    digits = []
+    while num:
+        digits.append(chr(DIGITS[num % base]))
+        num //= base
+    return ''.join(reversed(digits))
+
+def main():
+    import random
+    import time
+
+    print("=" * 80)
+    print("SUBQUADRATIC BASE CONVERSION")
+    print("=" * 80)
+
+    rng = random.Random(1)
+    agree = True
+    for base in range(2, 37):
+        for bits in (1, 7, 64, 300, 5000, 40000):
+            num = rng.getrandbits(bits)
+            agree &= to_base(num, base) == _naive_to_base(num, base)
+    print(f"Matches digit-by-digit conversion, bases 2-36: {'YES' if agree else 'NO'}")
+
+    population = [(10**43 - 1) // 173 * r for r in range(1, 2000)]
+    start_time = time.time()
+    batch = to_base_batch(population, (2, 3, 8))
+    agree = all(digit_string(batch[base][i]) == to_base(num, base)
+                for base in batch for i, num in enumerate(population))
+    print(f"Batch of {len(population)} x 3 bases: {time.time() - start_time:.2f}s, "
+          f"matches to_base: {'YES' if agree else 'NO'}")
+
+    agree = True
+    for base in range(2, 37):
+        for num in [base**k + d for k in (50, 400, 3000) for d in (-1, 0, 1)] + \
+                   [rng.getrandbits(bits) for bits in (200, 4000, 30000)]:
+            full = to_base(num, base)
+            agree &= digit_count(num, base) == len(full)
+            agree &= leading_digits(num, base, 70) == full[:70]
+    print(f"Digit counts and 70-digit prefixes match: {'YES' if agree else 'NO'}")
+
+    period_int = (10**100000 - 1) // 99991
+    for base in (3, 7):
+        start_time = time.time()
+        digits = to_base(period_int, base)
+        print(f"10^5-digit period integer in base {base}: {len(digits)} digits "
+              f"in {time.time() - start_time:.2f}s")
+        start_time = time.time()
+        length, prefix = representation(period_int, base)
+        print(f"  length and prefix only: {length} digits, {prefix[:20]}... "
+              f"in {time.time() - start_time:.4f}s")
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,8 @@ CLARIFICATION: What is the "ternary doubling" claim?
 Testing EXACTLY what the reviewer is disputing
 """
 
-def get_period_digits(n, max_digits=500):
-    """Extract the actual repeating period digits from 1/n"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < max_digits:
-        if remainder in seen:
-            period_start = seen[remainder]
-            period = ''.join(decimal_digits[period_start:])
-            return period_start, period
-        
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    
-    return 0, ''.join(decimal_digits)
-
-def to_base(num, base):
-    """Convert number to given base, return string"""
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        digits.append(str(num % base))
-        num //= base
-    return ''.join(reversed(digits))
+from base_conversion import to_base
+from periods import get_period_digits
 
 print("="*80)
 print("TERNARY DOUBLING CLARIFICATION")
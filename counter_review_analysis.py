@@ -6,6 +6,9 @@ Applying the same rigor to the reviewer that they applied to us
 
 import math
 
+import periods
+from base_conversion import to_base
+
 print("="*80)
 print("COUNTER-REVIEW: SYSTEMATIC FACT-CHECKING OF REVIEWER 8821")
 print("="*80)
@@ -64,32 +67,8 @@ print("  'The ternary representation of the period INTEGER has 44 digits'")
 
 def get_period_digits(n):
     """Get period string"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < 500:
-        if remainder in seen:
-            period_start = seen[remainder]
-            return ''.join(decimal_digits[period_start:])
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    return ''
-
-def to_base(num, base):
-    """Convert to base"""
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        digits.append(str(num % base))
-        num //= base
-    return ''.join(reversed(digits))
+    _, period = periods.get_period_digits(n)
+    return period
 
 # Test our actual claim
 period_str = get_period_digits(92)
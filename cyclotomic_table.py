@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Cyclotomic Factor Table - 10^k - 1 Factored Once, Kept on Disk
+10^k - 1 is the product of Phi_d(10) over d | k; each Phi_d(10) is factored
+a single time and appended to a compact versioned file read lazily
+"""
+
+import math
+import os
+import struct
+import time
+
+from number_theory import factorint, is_prime
+
+# ============================================================================
+# CYCLOTOMIC NUMBERS
+# ============================================================================
+
+def divisors(n):
+    """Sorted divisors of n"""
+    result = [1]
+    for p, e in factorint(n).items():
+        result = [d * p**i for d in result for i in range(e + 1)]
+    return sorted(result)
+
+def mobius(n):
+    """Moebius function mu(n)"""
+    factors = factorint(n)
+    if any(e > 1 for e in factors.values()):
+        return 0
+    return -1 if len(factors) % 2 else 1
+
+def cyclotomic_value(d, base=10):
+    """Phi_d(base) = prod over e | d of (base^e - 1)^mu(d/e)"""
+    numerator = denominator = 1
+    for e in divisors(d):
+        mu = mobius(d // e)
+        if mu == 1:
+            numerator *= base**e - 1
+        elif mu == -1:
+            denominator *= base**e - 1
+    return numerator // denominator
+
+# Primes of Phi_d(b) are 1 mod d (bar the largest prime of d): trial-divide
+# candidates jd + 1 up to this bound before the general-purpose engine
+ALGEBRAIC_TRIAL_BOUND = 2 * 10**6
+
+def factor_cyclotomic(d, base=10, max_time=None):
+    """
+    ({prime: exponent}, cofactor) for Phi_d(base)
+    cofactor is 1 when the factorization is complete, otherwise the
+    composite part that did not split within max_time seconds.
+    """
+    value = cyclotomic_value(d, base)
+    factors = {}
+
+    # The largest prime of d can divide Phi_d(base) (to the first power)
+    for p in factorint(d):
+        while value % p == 0 and value > 1:
+            factors[p] = factors.get(p, 0) + 1
+            value //= p
+
+    if value > 1 and d > 1:
+        for q in range(d + 1, min(ALGEBRAIC_TRIAL_BOUND, math.isqrt(value)) + 1, d):
+            while value % q == 0:
+                factors[q] = factors.get(q, 0) + 1
+                value //= q
+            if value == 1:
+                break
+
+    cofactor = 1
+    if value > 1:
+        rest = {value: 1} if is_prime(value) else factorint(value, max_time=max_time)
+        if rest is None:
+            cofactor = value
+        else:
+            for p, e in rest.items():
+                factors[p] = factors.get(p, 0) + e
+    return dict(sorted(factors.items())), cofactor
+
+# ============================================================================
+# FILE FORMAT
+# ============================================================================
+#
+# 16-byte header: magic, version, base (4 bytes reserved)
+# then an append-only log of records, each:
+#   d (uint32), payload length (uint32), payload
+# payload: comma-separated ASCII entries - hex prime with an optional
+# '^exponent', and '?' + hex for a composite part not yet split, with an
+# optional '~seconds': the largest time budget it has failed under.
+# A later record for the same d supersedes the earlier one.
+
+MAGIC = b'ALRCYCL\0'
+VERSION = 1
+HEADER_FORMAT = '<8sHHI'
+HEADER_SIZE = 16
+RECORD_FORMAT = '<II'
+RECORD_HEADER_SIZE = 8
+MAX_INDEX = 1000
+
+def default_path(base=10):
+    """Cache file for Phi_d(base), next to the period store shards"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'period_cache',
+                        f"cyclotomic_{base}.ctab")
+
+def encode_factors(factors, cofactor=1, budget=0):
+    entries = [f"{p:x}" if e == 1 else f"{p:x}^{e}" for p, e in factors.items()]
+    if cofactor > 1:
+        entries.append(f"?{cofactor:x}~{budget:g}")
+    return ','.join(entries).encode('ascii')
+
+def decode_factors(payload):
+    """(factors, cofactor, budget) - budget 0 for records written without one"""
+    factors, cofactor, budget = {}, 1, 0
+    for entry in payload.decode('ascii').split(','):
+        if not entry:
+            continue
+        if entry[0] == '?':
+            value, _, seconds = entry[1:].partition('~')
+            cofactor, budget = int(value, 16), float(seconds or 0)
+            continue
+        p, _, e = entry.partition('^')
+        factors[int(p, 16)] = int(e) if e else 1
+    return factors, cofactor, budget
+
+# ============================================================================
+# TABLE
+# ============================================================================
+
+class CyclotomicTable:
+    """
+    Lazily loaded factorizations of Phi_d(base) for d <= MAX_INDEX
+    Opening the file only reads record headers; payloads are decoded on
+    first use, and missing entries are factored and appended. An entry
+    left with a composite cofactor remembers the time budget it failed
+    under and is tried again whenever a caller offers more time (or no
+    limit at all).
+    """
+
+    def __init__(self, path=None, base=10):
+        self.base = base
+        self.path = path or default_path(base)
+        self._index = {}
+        self._cache = {}
+        self._budget = {}   # d -> largest max_time its cofactor failed under (inf: no limit)
+        if os.path.exists(self.path):
+            self._scan()
+
+    def _scan(self):
+        with open(self.path, 'rb') as f:
+            magic, version, base, _ = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a cyclotomic factor table")
+            if version != VERSION or base != self.base:
+                raise ValueError(f"{self.path}: unsupported version {version} / base {base}")
+            while True:
+                raw = f.read(RECORD_HEADER_SIZE)
+                if len(raw) < RECORD_HEADER_SIZE:
+                    break
+                d, length = struct.unpack(RECORD_FORMAT, raw)
+                offset = f.tell()
+                f.seek(length, os.SEEK_CUR)
+                if f.tell() > os.path.getsize(self.path):
+                    break  # torn final record
+                self._index[d] = (offset, length)
+
+    def _append(self, d, factors, cofactor):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fresh = not os.path.exists(self.path)
+        payload = encode_factors(factors, cofactor, self._budget.get(d, 0))
+        with open(self.path, 'ab') as f:
+            if fresh:
+                f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.base, 0))
+            f.write(struct.pack(RECORD_FORMAT, d, len(payload)))
+            self._index[d] = (f.tell(), len(payload))
+            f.write(payload)
+
+    def __contains__(self, d):
+        return d in self._index
+
+    def entry(self, d, max_time=None, retry=False):
+        """
+        ({prime: exponent}, cofactor) for Phi_d(base), factoring it if needed
+        A stored composite cofactor gets another attempt when max_time is
+        None or larger than the budget it failed under, or with retry=True.
+        """
+        if d > MAX_INDEX:
+            raise ValueError(f"cyclotomic table holds d <= {MAX_INDEX}")
+        if d not in self._cache and d in self._index:
+            offset, length = self._index[d]
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                factors, cofactor, self._budget[d] = decode_factors(f.read(length))
+            self._cache[d] = factors, cofactor
+
+        spent = float('inf') if max_time is None else max_time
+        if d not in self._cache:
+            self._cache[d] = factor_cyclotomic(d, self.base, max_time)
+            if self._cache[d][1] > 1:
+                self._budget[d] = spent
+            self._append(d, *self._cache[d])
+        elif self._cache[d][1] > 1 and (retry or max_time is None or max_time > self._budget[d]):
+            factors, cofactor = self._cache[d]
+            rest = factorint(cofactor, max_time=max_time)
+            if rest is None:
+                self._budget[d] = max(self._budget[d], spent)
+            else:
+                factors = dict(factors)
+                for p, e in rest.items():
+                    factors[p] = factors.get(p, 0) + e
+                self._cache[d] = dict(sorted(factors.items())), 1
+                del self._budget[d]
+            self._append(d, *self._cache[d])
+        return self._cache[d]
+
+    def power_minus_one(self, k, max_time=None):
+        """
+        ({prime: exponent}, cofactor) for base^k - 1, merged over d | k
+        cofactor collects the unsplit composite parts (1 if complete).
+        """
+        deadline = None if max_time is None else time.time() + max_time
+        factors, cofactor = {}, 1
+        for d in divisors(k):
+            remaining = None if deadline is None else max(deadline - time.time(), 0.01)
+            part, rest = self.entry(d, remaining)
+            for p, e in part.items():
+                factors[p] = factors.get(p, 0) + e
+            cofactor *= rest
+        return dict(sorted(factors.items())), cofactor
+
+_tables = {}
+
+def cyclotomic_table(base=10):
+    """Shared CyclotomicTable for base (default cache file)"""
+    if base not in _tables:
+        _tables[base] = CyclotomicTable(base=base)
+    return _tables[base]
+
+# ============================================================================
+# FACTORING WITH THE TABLE
+# ============================================================================
+
+def factor_power_minus_one(k, max_time=None, base=10):
+    """
+    Prime factorization of base^k - 1, or None if part of it is still unsplit
+    Exponents beyond the table go straight to factorint.
+    """
+    if k > MAX_INDEX:
+        return factorint(base**k - 1, max_time=max_time)
+    factors, cofactor = cyclotomic_table(base).power_minus_one(k, max_time)
+    return factors if cofactor == 1 else None
+
+def factor_with_table(n, k, max_time=None, base=10):
+    """
+    Prime factorization of n whose primes mostly come from base^k - 1
+    (a period integer (10^k - 1) * r / m, say): the known primes of
+    base^k - 1 are divided out first and only the rest goes to factorint.
+    Returns None if that rest takes longer than max_time.
+    """
+    if n < 2:
+        return {}
+    deadline = None if max_time is None else time.time() + max_time
+    known = cyclotomic_table(base).power_minus_one(k, max_time)[0] if k <= MAX_INDEX else {}
+    factors = {}
+    for p in known:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    if n > 1:
+        remaining = None if deadline is None else max(deadline - time.time(), 0.01)
+        rest = factorint(n, max_time=remaining)
+        if rest is None:
+            return None
+        for p, e in rest.items():
+            factors[p] = factors.get(p, 0) + e
+    return dict(sorted(factors.items()))
+
+def build_cyclotomic_table(max_index=MAX_INDEX, max_time=5.0, base=10, verbose=False):
+    """Fill the table for d = 1..max_index, giving each entry max_time seconds"""
+    table = cyclotomic_table(base)
+    incomplete = []
+    for d in range(1, max_index + 1):
+        if table.entry(d, max_time)[1] > 1:
+            incomplete.append(d)
+        if verbose and d % 50 == 0:
+            print(f"  Phi_d({base}) for d <= {d}: {len(incomplete)} incomplete")
+    return incomplete
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    import tempfile
+
+    print("=" * 80)
+    print("CYCLOTOMIC FACTOR TABLE FOR 10^k - 1")
+    print("=" * 80)
+
+    start_time = time.time()
+    incomplete = build_cyclotomic_table(60, max_time=2.0)
+    print(f"Phi_d(10) for d <= 60: {time.time() - start_time:.2f}s, "
+          f"incomplete: {incomplete or 'none'}")
+
+    for k in [8, 22, 43, 86]:
+        start_time = time.time()
+        factors = factor_power_minus_one(k)
+        shown = ' x '.join(f"{p}^{e}" if e > 1 else str(p) for p, e in factors.items())
+        print(f"10^{k} - 1 = {shown} ({time.time() - start_time:.4f}s)")
+        assert math.prod(p**e for p, e in factors.items()) == 10**k - 1
+
+    # An entry that runs out of time keeps its cofactor and budget on disk,
+    # and is finished by the next call that offers more (or unlimited) time
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cyclotomic_10.ctab')
+        first = CyclotomicTable(path).entry(53, max_time=0.01)
+        reopened = CyclotomicTable(path)
+        stored = reopened.entry(53, max_time=0.01)
+        finished = reopened.entry(53)
+        complete = CyclotomicTable(path).entry(53)
+        print(f"\nPhi_53(10) with 0.01s: cofactor left {'YES' if first[1] > 1 else 'NO'}, "
+              f"kept on reopening {'YES' if stored == first else 'NO'}; "
+              f"finished without a limit: {'YES' if finished[1] == 1 else 'NO'}, "
+              f"stored complete: {'YES' if complete == finished else 'NO'}")
+        print(f"Unbounded budget round-trips: "
+              f"{'YES' if decode_factors(encode_factors({3: 1}, 35, float('inf')))[2] == float('inf') else 'NO'}")
+
+    period_173 = (10**43 - 1) // 173
+    start_time = time.time()
+    print(f"\nPeriod integer of 1/173: {factor_with_table(period_173, 43)} "
+          f"({time.time() - start_time:.4f}s)")
+
+if __name__ == "__main__":
+    main()
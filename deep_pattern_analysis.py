@@ -5,9 +5,20 @@ Searches for connections between period digits and mathematical constants
 """
 
 import sys
-from collections import Counter
+from functools import lru_cache
 from itertools import combinations
 
+from digit_stats import digit_statistics, parallel_digit_statistics
+from pattern_search import PatternMatcher, cyclic_palindromes, maximal_palindromes, stream_palindromes
+from periods import Period, Repetend, iter_digits
+from remainder_tree import batch_residues
+
+# Periods at least this long are never built: their digit statistics come
+# from worker processes that each regenerate and scan one range of the
+# period, and the text passes stream the digits in STREAM_BLOCK blocks
+LARGE_PERIOD_DIGITS = 10**7
+STREAM_BLOCK = 4096
+
 # ============================================================================
 # MATHEMATICAL CONSTANTS FROM EXCEPTIONAL STRUCTURES
 # ============================================================================
@@ -88,21 +99,22 @@ class ExceptionalStructures:
 # PATTERN MATCHING FUNCTIONS
 # ============================================================================
 
-def find_subsequences(period_str, target_numbers):
-    """Find if any target numbers appear as subsequences in period"""
+@lru_cache(maxsize=None)
+def catalog_matcher(patterns):
+    """Aho-Corasick automaton for a tuple of decimal strings, built once"""
+    return PatternMatcher(patterns)
+
+def find_subsequences(period_str, target_numbers, cyclic=False):
+    """
+    Find if any target numbers appear as subsequences in period
+    One Aho-Corasick pass finds every target at once; cyclic=True also
+    counts occurrences wrapping around the end of the period.
+    """
+    occurrences = catalog_matcher(tuple(str(num) for num in target_numbers)).find_all(period_str, cyclic)
     matches = []
     for num in target_numbers:
-        num_str = str(num)
-        if num_str in period_str:
-            # Find all positions
-            positions = []
-            start = 0
-            while True:
-                pos = period_str.find(num_str, start)
-                if pos == -1:
-                    break
-                positions.append(pos)
-                start = pos + 1
+        positions = occurrences.get(str(num))
+        if positions:
             matches.append({
                 'number': num,
                 'positions': positions,
@@ -110,73 +122,63 @@ def find_subsequences(period_str, target_numbers):
             })
     return matches
 
+def stream_subsequences(chunks, target_numbers, shown=5):
+    """
+    find_subsequences over a period arriving in chunks, in bounded memory
+    Counts every occurrence but keeps only the first shown positions.
+    """
+    counts, positions = {}, {}
+    matcher = catalog_matcher(tuple(str(num) for num in target_numbers))
+    for start, pattern in matcher.iter_chunk_matches(chunks):
+        counts[pattern] = counts.get(pattern, 0) + 1
+        if counts[pattern] <= shown:
+            positions.setdefault(pattern, []).append(start)
+    return [{'number': num, 'positions': positions[str(num)], 'count': counts[str(num)]}
+            for num in target_numbers if str(num) in counts]
+
 def find_modular_matches(period_int, structures_dict):
-    """Check if period % key_number reveals patterns"""
+    """
+    Check if period % key_number reveals patterns
+    All residues come from one remainder tree over the constants; period_int
+    may be a Repetend, in which case the integer is never built.
+    """
+    constants = [(name, value) for name, value in structures_dict.items()
+                 if isinstance(value, int) and value > 0 and value < 10**6]
+    residues = batch_residues(period_int, [value for _, value in constants])
+    
     matches = []
-    for name, value in structures_dict.items():
-        if isinstance(value, int) and value > 0 and value < 10**6:
-            result = period_int % value
-            if result == 0:
-                matches.append({
-                    'structure': name,
-                    'value': value,
-                    'remainder': result,
-                    'type': 'perfect_divisor'
-                })
-            elif result == 1:
-                matches.append({
-                    'structure': name,
-                    'value': value,
-                    'remainder': result,
-                    'type': 'one_more_than_multiple'
-                })
-            elif result == value - 1:
-                matches.append({
-                    'structure': name,
-                    'value': value,
-                    'remainder': result,
-                    'type': 'one_less_than_multiple'
-                })
+    for name, value in constants:
+        result = residues[value]
+        if result == 0:
+            matches.append({
+                'structure': name,
+                'value': value,
+                'remainder': result,
+                'type': 'perfect_divisor'
+            })
+        elif result == 1:
+            matches.append({
+                'structure': name,
+                'value': value,
+                'remainder': result,
+                'type': 'one_more_than_multiple'
+            })
+        elif result == value - 1:
+            matches.append({
+                'structure': name,
+                'value': value,
+                'remainder': result,
+                'type': 'one_less_than_multiple'
+            })
     return matches
 
-def find_digit_patterns(period_str):
-    """Analyze digit distribution and patterns"""
-    digits = [int(d) for d in period_str]
-    
-    patterns = {
-        'digit_frequency': dict(Counter(digits)),
-        'most_common': Counter(digits).most_common(3),
-        'least_common': Counter(digits).most_common()[-3:] if len(Counter(digits)) >= 3 else [],
-        'runs': find_runs(period_str),
-        'symmetries': find_symmetries(period_str),
-    }
-    return patterns
-
-def find_runs(s):
-    """Find consecutive repeated digits"""
-    runs = []
-    if not s:
-        return runs
-    
-    current_digit = s[0]
-    current_run = 1
-    
-    for i in range(1, len(s)):
-        if s[i] == current_digit:
-            current_run += 1
-        else:
-            if current_run >= 2:
-                runs.append({'digit': current_digit, 'length': current_run, 'position': i - current_run})
-            current_digit = s[i]
-            current_run = 1
-    
-    if current_run >= 2:
-        runs.append({'digit': current_digit, 'length': current_run, 'position': len(s) - current_run})
-    
-    return runs
-
-def find_symmetries(s):
-    """Check for palindromic or symmetric patterns"""
+def find_symmetries(s, min_length=5, cyclic=False):
+    """
+    Check for palindromic or symmetric patterns
+    Every maximal palindrome of at least min_length digits, any length, in
+    one linear Manacher pass (cyclic=True also finds those wrapping around
+    the period boundary).
+    """
     length = len(s)
     symmetries = []
     
@@ -184,40 +186,40 @@ def find_symmetries(s):
     if s == s[::-1]:
         symmetries.append({'type': 'full_palindrome', 'length': length})
     
-    # Check for partial palindromes (substrings of length >= 5)
-    for start in range(len(s) - 4):
-        for end in range(start + 5, min(start + 15, len(s) + 1)):
-            substring = s[start:end]
-            if substring == substring[::-1]:
-                symmetries.append({
-                    'type': 'partial_palindrome',
-                    'string': substring,
-                    'position': start,
-                    'length': len(substring)
-                })
-    
-    return symmetries[:10]  # Limit to first 10
+    found = cyclic_palindromes(s, min_length) if cyclic else maximal_palindromes(s, min_length)
+    for start, size in found:
+        if len(symmetries) == 10:  # Limit to first 10
+            break
+        if size == length:
+            continue
+        end = start + size
+        symmetries.append({
+            'type': 'partial_palindrome',
+            'string': s[start:end] if end <= length else s[start:] + s[:end - length],
+            'position': start,
+            'length': size
+        })
+    
+    return symmetries
 
-def analyze_arithmetic_sequences(period_str):
-    """Look for arithmetic progressions in the digits"""
-    digits = [int(d) for d in period_str]
-    sequences = []
-    
-    # Look for sequences of length 3+
-    for start in range(len(digits) - 2):
-        for length in range(3, min(len(digits) - start + 1, 8)):
-            subseq = digits[start:start+length]
-            if len(subseq) >= 3:
-                diffs = [subseq[i+1] - subseq[i] for i in range(len(subseq)-1)]
-                if len(set(diffs)) == 1:  # All differences are the same
-                    sequences.append({
-                        'position': start,
-                        'sequence': subseq,
-                        'difference': diffs[0],
-                        'length': length
-                    })
-    
-    return sequences[:10]  # Limit output
+def stream_symmetries(repetend, min_length=5, limit=10):
+    """
+    find_symmetries for a period too long to hold, digits generated on the fly
+    The first limit maximal palindromes in order of their centre (capped
+    at 1000 digits); the whole-period palindrome check is left out.
+    """
+    chunks = iter_digits(repetend.n, repetend.start, repetend.length, STREAM_BLOCK)
+    symmetries = []
+    for start, size in stream_palindromes(chunks, min_length):
+        if len(symmetries) == limit:
+            break
+        symmetries.append({
+            'type': 'partial_palindrome',
+            'string': repetend.digits(start, size),
+            'position': start,
+            'length': size
+        })
+    return symmetries
 
 def find_factor_connections(period_int, period_length, structures):
     """Check if period relates to structure through factorization"""
@@ -249,8 +251,14 @@ def find_factor_connections(period_int, period_length, structures):
 # MAIN ANALYSIS FUNCTION
 # ============================================================================
 
-def deep_analysis(n, period_str, period_int):
-    """Perform comprehensive pattern analysis"""
+def deep_analysis(n, period, period_int):
+    """
+    Perform comprehensive pattern analysis
+    period is a periods.Period; period_int anything supporting % (a
+    Repetend keeps the modular checks off the built integer). For a
+    period too long to hold, period is None and period_int a Repetend:
+    the digit passes then stream or run in worker processes.
+    """
     
     print(f"\n{'='*80}")
     print(f"DEEP PATTERN ANALYSIS: 1/{n}")
@@ -273,7 +281,11 @@ def deep_analysis(n, period_str, period_int):
     # Remove non-integers and make unique
     target_numbers = list(set([x for x in all_target_numbers if isinstance(x, int) and 0 < x < 10**6]))
     
-    matches = find_subsequences(period_str, target_numbers)
+    if period is None:
+        chunks = iter_digits(n, period_int.start, period_int.length, STREAM_BLOCK)
+        matches = stream_subsequences(chunks, target_numbers)
+    else:
+        matches = find_subsequences(period.text, target_numbers)
     found_matches = [m for m in matches if m['count'] > 0]
     
     if found_matches:
@@ -284,7 +296,11 @@ def deep_analysis(n, period_str, period_int):
         print("   No direct number matches found")
     
     # Special check for 729 (ternary Golay codewords AND appears in 1/137)
-    if '729' in period_str:
+    if period is None:
+        has_729 = any(m['number'] == 729 for m in found_matches)
+    else:
+        has_729 = '729' in period
+    if has_729:
         print(f"\n   ⭐ SPECIAL: 729 (3^6, ternary Golay codewords) found in period!")
     
     # 2. Modular arithmetic patterns
@@ -314,20 +330,27 @@ def deep_analysis(n, period_str, period_int):
     # 3. Digit pattern analysis
     print("\n>> DIGIT PATTERN ANALYSIS:")
     
-    digit_patterns = find_digit_patterns(period_str)
+    # one pass: frequencies, runs, progressions, moments
+    if period is None:
+        stats = parallel_digit_statistics(n)
+        symmetries = stream_symmetries(period_int)
+    else:
+        stats = digit_statistics(period.view())
+        symmetries = find_symmetries(period.text)
     
     print(f"\n   Digit frequency:")
-    for digit, count in sorted(digit_patterns['digit_frequency'].items()):
-        print(f"     {digit}: {count} times")
+    for digit, count in enumerate(stats['frequency']):
+        if count:
+            print(f"     {digit}: {count} times")
     
-    if digit_patterns['runs']:
+    if stats['runs']:
         print(f"\n   Consecutive digit runs:")
-        for run in digit_patterns['runs'][:5]:
+        for run in stats['runs'][:5]:
             print(f"     {run['digit']} repeated {run['length']} times at position {run['position']}")
     
-    if digit_patterns['symmetries']:
+    if symmetries:
         print(f"\n   Symmetric patterns (palindromes):")
-        for sym in digit_patterns['symmetries'][:5]:
+        for sym in symmetries[:5]:
             if sym['type'] == 'full_palindrome':
                 print(f"     FULL PALINDROME of length {sym['length']}")
             else:
@@ -336,9 +359,8 @@ def deep_analysis(n, period_str, period_int):
     # 4. Arithmetic sequences
     print("\n>> ARITHMETIC PROGRESSIONS IN DIGITS:")
     
-    arith_seqs = analyze_arithmetic_sequences(period_str)
-    if arith_seqs:
-        for seq in arith_seqs[:5]:
+    if stats['progressions']:
+        for seq in stats['progressions'][:5]:
             print(f"     {seq['sequence']} (diff={seq['difference']}) at position {seq['position']}")
     else:
         print("   No arithmetic progressions found")
@@ -346,7 +368,7 @@ def deep_analysis(n, period_str, period_int):
     # 5. High-level structural connections
     print("\n>> STRUCTURAL CONNECTIONS:")
     
-    factor_connections = find_factor_connections(period_int, len(period_str), structures)
+    factor_connections = find_factor_connections(period_int, stats['length'], structures)
     if factor_connections:
         for conn in factor_connections:
             print(f"   ⭐ {conn}")
@@ -356,47 +378,9 @@ def deep_analysis(n, period_str, period_int):
     # 6. Statistical analysis
     print("\n>> STATISTICAL PROPERTIES:")
     
-    digits = [int(d) for d in period_str]
-    mean = sum(digits) / len(digits)
-    variance = sum((d - mean)**2 for d in digits) / len(digits)
-    
-    print(f"   Mean digit value: {mean:.3f}")
-    print(f"   Variance: {variance:.3f}")
-    print(f"   Entropy: {calculate_entropy(period_str):.3f} bits")
-
-def calculate_entropy(s):
-    """Calculate Shannon entropy of digit string"""
-    from math import log2
-    freq = Counter(s)
-    length = len(s)
-    entropy = -sum((count/length) * log2(count/length) for count in freq.values())
-    return entropy
-
-# ============================================================================
-# PERIOD COMPUTATION (from previous script)
-# ============================================================================
-
-def get_period_digits(n, max_digits=500):
-    """Extract the repeating period digits from 1/n"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < max_digits:
-        if remainder in seen:
-            period_start = seen[remainder]
-            period = ''.join(decimal_digits[period_start:])
-            return period_start, period
-        
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    
-    return 0, ''.join(decimal_digits)
+    print(f"   Mean digit value: {stats['mean']:.3f}")
+    print(f"   Variance: {stats['variance']:.3f}")
+    print(f"   Entropy: {stats['entropy']:.3f} bits")
 
 # ============================================================================
 # MAIN PROGRAM
@@ -425,21 +409,24 @@ def main():
         
         # Get period
         print(f"\n>> Computing period for 1/{n}...")
-        period_start, period_str = get_period_digits(n, max_digits=500)
+        repetend = Repetend(n)
+        if repetend.length >= LARGE_PERIOD_DIGITS:
+            # Too long to hold - never built, digits generated as needed
+            period = None
+            preview, length = repetend.digits(0, 80), repetend.length
+        else:
+            period = Period(n)
+            preview, length = period[:80], len(period)
         
-        if not period_str or period_str == '0':
+        if not length:
             print(f"   Could not compute period for {n}")
             continue
         
-        period_length = len(period_str)
-        period_int = int(period_str) if period_str else 0
-        
-        print(f"   Period: {period_str[:80]}{'...' if len(period_str) > 80 else ''}")
-        print(f"   Length: {period_length}")
+        print(f"   Period: {preview}{'...' if length > 80 else ''}")
+        print(f"   Length: {length}")
         
-        # Perform deep analysis
-        if period_int > 0:
-            deep_analysis(n, period_str, period_int)
+        # Perform deep analysis (modular checks never build the integer)
+        deep_analysis(n, period, repetend)
     
     print("\n" + "=" * 80)
     print("ANALYSIS COMPLETE")
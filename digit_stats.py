@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Digit Statistics - One Fused Pass over the Digits of a Period
+Frequencies, mean, variance, entropy, k-grams, runs of equal digits and
+arithmetic progressions of every length from a single chunked scan of
+uint8 digits, or from ranges of the period scanned in parallel and merged
+"""
+
+import functools
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from periods import DIGIT_BLOCK, digit, get_period_digits, iter_digits, period_info
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - fall back to a plain byte scan
+    np = None
+
+CHUNK_SIZE = 1 << 22    # digits per vectorized step (bounds working memory)
+RECORD_LIMIT = 10       # runs / progressions listed individually
+ASCII_TO_DIGIT = bytes((i - 48) % 256 for i in range(256))
+
+# ============================================================================
+# MAXIMAL SEGMENTS
+# ============================================================================
+
+class _Segments:
+    """
+    Maximal runs of equal values in a sequence fed one chunk at a time
+    Only the run still open at the chunk boundary is carried over. The
+    first closed run is held back as the head, since it may continue a
+    run of the range before when two ranges are merged; later closed runs
+    of at least min_length are tallied by length, the first few kept as
+    (position, length, value) and the longest (first one) remembered.
+    """
+
+    def __init__(self, min_length, limit=RECORD_LIMIT):
+        self.min_length = min_length
+        self.limit = limit
+        self.start = 0
+        self.value = None   # value of the open run (None until fed)
+        self.head = None
+        self.lengths = {}
+        self.first = []
+        self.longest = None
+
+    def feed(self, starts, values):
+        """Positions (ascending) where new runs begin in this chunk, with their values"""
+        if self.value is None:
+            if not len(starts):
+                return
+            self.start, self.value = int(starts[0]), int(values[0])
+            starts, values = starts[1:], values[1:]
+        if not len(starts):
+            return
+
+        if np is not None:
+            bounds = np.concatenate(([self.start], starts))
+            lengths = np.diff(bounds)
+            segment_values = np.concatenate(([self.value], values[:-1]))
+        else:
+            bounds = [self.start] + list(starts)
+            lengths = [b - a for a, b in zip(bounds, bounds[1:])]
+            segment_values = [self.value] + list(values[:-1])
+        if self.head is None:
+            self.head = (int(bounds[0]), int(lengths[0]), int(segment_values[0]))
+            bounds, lengths, segment_values = bounds[1:], lengths[1:], segment_values[1:]
+
+        if np is not None:
+            keep = np.flatnonzero(lengths >= self.min_length)
+            if len(keep):
+                self._close(bounds[keep].tolist(), lengths[keep], segment_values[keep].tolist())
+        else:
+            keep = [i for i, size in enumerate(lengths) if size >= self.min_length]
+            if keep:
+                self._close([bounds[i] for i in keep], [lengths[i] for i in keep],
+                            [segment_values[i] for i in keep])
+        self.start, self.value = int(starts[-1]), int(values[-1])
+
+    def _close(self, positions, lengths, values):
+        """Tally closed runs (all at least min_length long)"""
+        if np is not None:
+            sizes, counts = np.unique(lengths, return_counts=True)
+            tally = zip(sizes.tolist(), counts.tolist())
+            best = int(np.argmax(lengths))
+            lengths = lengths.tolist()
+        else:
+            tally = ((size, lengths.count(size)) for size in set(lengths))
+            best = lengths.index(max(lengths))
+        for size, count in tally:
+            self.lengths[size] = self.lengths.get(size, 0) + count
+        if len(self.first) < self.limit:
+            self.first.extend(zip(positions[:self.limit - len(self.first)], lengths, values))
+        if self.longest is None or lengths[best] > self.longest[1]:
+            self.longest = (positions[best], lengths[best], values[best])
+
+    def _add(self, position, length, value):
+        """Close a single run"""
+        if self.head is None:
+            self.head = (position, length, value)
+        elif length >= self.min_length:
+            self._close([position], np.array([length]) if np is not None else [length], [value])
+
+    def merge(self, other, joined):
+        """
+        Append the runs of the range directly after this one (other is consumed)
+        joined says whether the open run here continues into the first
+        run of other (equal values across the boundary).
+        """
+        if other.value is None:
+            return
+        if self.value is None:
+            self.__dict__.update(vars(other))
+            return
+
+        if other.head is None:  # other is a single open run
+            if not joined:
+                self._add(self.start, other.start - self.start, self.value)
+                self.start, self.value = other.start, other.value
+            return
+
+        position, length, value = other.head
+        if joined:
+            self._add(self.start, position + length - self.start, self.value)
+        else:
+            self._add(self.start, position - self.start, self.value)
+            self._add(position, length, value)
+        for size, count in other.lengths.items():
+            self.lengths[size] = self.lengths.get(size, 0) + count
+        self.first.extend(other.first[:max(self.limit - len(self.first), 0)])
+        if other.longest is not None and (self.longest is None or other.longest[1] > self.longest[1]):
+            self.longest = other.longest
+        self.start, self.value = other.start, other.value
+
+    def summary(self, end):
+        """(lengths, first, longest) with the head and the open run (closed at end) counted"""
+        lengths, first, longest = dict(self.lengths), list(self.first), self.longest
+        runs = [self.head] if self.head is not None else []
+        if self.value is not None:
+            runs.append((self.start, end - self.start, self.value))
+        for run in runs:
+            size = run[1]
+            if size < self.min_length:
+                continue
+            lengths[size] = lengths.get(size, 0) + 1
+            if run is self.head:
+                first.insert(0, run)
+                if longest is None or size >= longest[1]:
+                    longest = run
+            else:
+                first.append(run)
+                if longest is None or size > longest[1]:
+                    longest = run
+        return dict(sorted(lengths.items())), first[:self.limit], longest
+
+# ============================================================================
+# FUSED KERNEL
+# ============================================================================
+
+def _as_digits(chunk):
+    """Digit values 0-9 (uint8 array, or bytes without numpy) from str, ASCII bytes or an array"""
+    if isinstance(chunk, str):
+        chunk = chunk.encode('ascii')
+    if isinstance(chunk, (bytes, bytearray, memoryview)):
+        if np is None:
+            return bytes(chunk).translate(ASCII_TO_DIGIT)
+        return np.frombuffer(chunk, dtype=np.uint8) - 48
+    return chunk
+
+def _changes(seq, previous):
+    """Indices i where seq[i] differs from the element before it (previous before seq[0])"""
+    if np is not None:
+        changes = np.flatnonzero(seq[1:] != seq[:-1]) + 1
+        if previous is None or seq[0] != previous:
+            changes = np.concatenate(([0], changes))
+        return changes
+    changes = [i for i in range(1, len(seq)) if seq[i] != seq[i - 1]]
+    if previous is None or seq[0] != previous:
+        changes.insert(0, 0)
+    return changes
+
+def _kgram_counts(values, k):
+    """Counts of every k-digit window of values, indexed by the window read as a number"""
+    windows = len(values) - k + 1
+    if windows <= 0:
+        return [0] * 10**k
+    if np is not None:
+        codes = np.zeros(windows, dtype=np.int64)
+        for j in range(k):
+            codes = codes * 10 + values[j:j + windows]
+        return np.bincount(codes, minlength=10**k).tolist()
+    counts = [0] * 10**k
+    for i in range(windows):
+        code = 0
+        for d in values[i:i + k]:
+            code = code * 10 + d
+        counts[code] += 1
+    return counts
+
+class DigitStatistics:
+    """
+    Streaming accumulator for the digit statistics of one period
+    Feed consecutive chunks with update(); every quantity is gathered in
+    the same pass and only boundary state survives between chunks, so
+    the period itself never has to be held in memory. An accumulator can
+    also cover just the range of positions from offset on; consecutive
+    ranges then combine with merge(), provided each later range was
+    seeded with previous, the digit in front of it.
+    """
+
+    def __init__(self, min_run=2, min_progression=3, limit=RECORD_LIMIT, kgram=2,
+                 offset=0, previous=None):
+        self.offset = offset
+        self.length = 0
+        self.frequency = [0] * 10
+        self.kgram = kgram
+        self.kgrams = [0] * 10**kgram
+        self.head_digits = b''   # first and last kgram - 1 digit values,
+        self.tail_digits = b''   # for the k-grams across a merge boundary
+        self.previous = previous
+        self.last_digit = previous
+        self.first_digit = None
+        self.first_step = None
+        self.last_step = None
+        self.runs = _Segments(min_run, limit)
+        # a progression of L digits is a run of L - 1 equal steps
+        self.progressions = _Segments(min_progression - 1, limit)
+
+    def update(self, chunk):
+        """Scan the next chunk (str, ASCII bytes or uint8 digit array)"""
+        digits = _as_digits(chunk)
+        size = len(digits)
+        if not size:
+            return
+        position = self.offset + self.length
+        run_previous = self.last_digit if self.length else None
+
+        if np is not None:
+            counts = np.bincount(digits, minlength=10).tolist()
+            values = digits.astype(np.int16)
+            if self.last_digit is not None:
+                values = np.concatenate(([self.last_digit], values))
+            steps = np.diff(values)
+            codes = 10 * steps + values[:-1]  # step and the digit it leaves from
+            run_starts = _changes(digits, run_previous)
+            step_starts = _changes(steps, self.last_step) if len(steps) else run_starts[:0]
+            run_values, step_values = digits[run_starts], codes[step_starts]
+            grams = np.concatenate((np.frombuffer(self.tail_digits, dtype=np.uint8), digits)).astype(np.int64)
+        else:
+            counts = [digits.count(d) for d in range(10)]
+            values = digits if self.last_digit is None else bytes([self.last_digit]) + digits
+            steps = [values[i + 1] - values[i] for i in range(len(values) - 1)]
+            run_starts = _changes(digits, run_previous)
+            step_starts = _changes(steps, self.last_step) if steps else []
+            run_values = [digits[i] for i in run_starts]
+            step_values = [10 * steps[i] + values[i] for i in step_starts]
+            grams = self.tail_digits + digits
+        self.frequency = [a + b for a, b in zip(self.frequency, counts)]
+        self.kgrams = [a + b for a, b in zip(self.kgrams, _kgram_counts(grams, self.kgram))]
+
+        # step j goes from digit j to digit j + 1
+        step_offset = position - (len(values) - size)
+        self.runs.feed([position + i for i in run_starts] if np is None else run_starts + position, run_values)
+        self.progressions.feed([step_offset + i for i in step_starts] if np is None else step_starts + step_offset,
+                               step_values)
+
+        if self.first_digit is None:
+            self.first_digit = int(digits[0])
+        if self.first_step is None and len(steps):
+            self.first_step = int(steps[0])
+        if len(steps):
+            self.last_step = int(steps[-1])
+        keep = self.kgram - 1
+        if keep:
+            if len(self.head_digits) < keep:
+                self.head_digits = (self.head_digits + bytes(digits[:keep]))[:keep]
+            self.tail_digits = bytes(grams[-keep:].astype(np.uint8) if np is not None else grams[-keep:])
+        self.length += size
+        self.last_digit = int(digits[-1])
+
+    def merge(self, other):
+        """
+        Fold in the statistics of the range right after this one (other is consumed)
+        other must start where this range ends and have been seeded with
+        previous = this range's last digit, so it holds the step across the
+        boundary; runs, progressions and k-grams crossing it are joined here.
+        """
+        if not other.length:
+            return self
+        if not self.length:
+            self.__dict__.update(vars(other))
+            return self
+        if other.offset != self.offset + self.length or other.previous != self.last_digit:
+            raise ValueError("ranges must be consecutive, the later one seeded with the digit before it")
+
+        self.frequency = [a + b for a, b in zip(self.frequency, other.frequency)]
+        self.kgrams = [a + b for a, b in zip(self.kgrams, other.kgrams)]
+        keep = self.kgram - 1
+        if keep:
+            window = self.tail_digits + other.head_digits
+            for i in range(len(self.tail_digits)):
+                if i + self.kgram <= len(window):
+                    code = 0
+                    for d in window[i:i + self.kgram]:
+                        code = code * 10 + d
+                    self.kgrams[code] += 1
+            self.head_digits = (self.head_digits + other.head_digits)[:keep]
+            self.tail_digits = (self.tail_digits + other.tail_digits)[-keep:]
+
+        self.runs.merge(other.runs, self.last_digit == other.first_digit)
+        self.progressions.merge(other.progressions, self.last_step == other.first_step)
+        self.length += other.length
+        self.last_digit = other.last_digit
+        self.last_step = other.last_step
+        return self
+
+    def result(self):
+        """Compact record of everything gathered so far"""
+        length = self.length
+        end = self.offset + length
+        frequency = self.frequency
+        mean = sum(d * c for d, c in enumerate(frequency)) / length if length else 0.0
+        variance = sum(c * (d - mean) ** 2 for d, c in enumerate(frequency)) / length if length else 0.0
+        entropy = -sum((c / length) * math.log2(c / length) for c in frequency if c)
+
+        run_lengths, first_runs, longest_run = self.runs.summary(end)
+        step_lengths, first_steps, longest_steps = self.progressions.summary(end - 1)
+
+        def run(record):
+            position, size, digit = record
+            return {'digit': str(digit), 'length': size, 'position': position}
+
+        def progression(record):
+            position, size, code = record
+            difference, first = divmod(code, 10)
+            return {'position': position, 'length': size + 1, 'difference': difference,
+                    'sequence': [first + k * difference for k in range(min(size + 1, 20))]}
+
+        return {
+            'length': length,
+            'frequency': frequency,
+            'mean': mean,
+            'variance': variance,
+            'entropy': entropy,
+            'kgram': self.kgram,
+            'kgram_counts': self.kgrams,
+            'runs': [run(r) for r in first_runs],
+            'run_lengths': run_lengths,
+            'longest_run': run(longest_run) if longest_run else None,
+            'progressions': [progression(r) for r in first_steps],
+            'progression_lengths': {size + 1: count for size, count in step_lengths.items()},
+            'longest_progression': progression(longest_steps) if longest_steps else None,
+        }
+
+def iter_chunks(digits, chunk_size=CHUNK_SIZE):
+    """Chunks of a str, bytes or array (zero-copy slices), or the chunks of an iterable"""
+    if isinstance(digits, (str, bytes, bytearray, memoryview)) or (np is not None and isinstance(digits, np.ndarray)):
+        for i in range(0, len(digits), chunk_size):
+            yield digits[i:i + chunk_size]
+    else:
+        yield from digits
+
+def digit_statistics(digits, min_run=2, min_progression=3, limit=RECORD_LIMIT, kgram=2,
+                     chunk_size=CHUNK_SIZE):
+    """
+    Digit statistics of a period in one pass
+    digits is a str, ASCII bytes, a uint8 array of digit values, or an
+    iterable of such chunks (a period streamed from disk or generated on
+    the fly). Runs are maximal blocks of one repeated digit; progressions
+    are maximal blocks with a constant step between neighbours (runs of 3+
+    included, step 0); kgram_counts[c] counts the kgram-digit windows
+    reading c.
+    """
+    stats = DigitStatistics(min_run, min_progression, limit, kgram)
+    for chunk in iter_chunks(digits, chunk_size):
+        stats.update(chunk)
+    return stats.result()
+
+# ============================================================================
+# PARALLEL RANGES
+# ============================================================================
+
+def _range_statistics(n, place, offset, count, options):
+    """Worker: statistics of period positions [offset, offset + count) of 1/n, generated from place"""
+    previous = digit(n, place - 1) if offset else None
+    stats = DigitStatistics(*options, offset=offset, previous=previous)
+    blocks = iter_digits(n, place, count)
+    while True:
+        chunk = ''.join(itertools.islice(blocks, CHUNK_SIZE // DIGIT_BLOCK))
+        if not chunk:
+            return stats
+        stats.update(chunk)
+
+def parallel_digit_statistics(n, workers=None, ranges=None, min_run=2, min_progression=3,
+                              limit=RECORD_LIMIT, kgram=2):
+    """
+    Digit statistics of the period of 1/n, which is never held anywhere
+    The period is cut into offset ranges. Each worker process seeks to
+    its range with 10^place mod n, generates the digits by block long
+    division and scans them in bounded memory; the partial aggregates
+    are merged in order. Gives the same record as digit_statistics.
+    """
+    options = (min_run, min_progression, limit, kgram)
+    start, length = period_info(n)
+    if length == 0:
+        return digit_statistics(get_period_digits(n)[1], *options)
+
+    workers = workers or os.cpu_count() or 1
+    ranges = min(ranges or 4 * workers, length)
+    bounds = [length * i // ranges for i in range(ranges + 1)]
+    tasks = [(n, start + lo, lo, hi - lo, options) for lo, hi in zip(bounds, bounds[1:])]
+
+    if workers <= 1:
+        parts = (_range_statistics(*task) for task in tasks)
+        return functools.reduce(DigitStatistics.merge, parts).result()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_range_statistics, *zip(*tasks))
+        return functools.reduce(DigitStatistics.merge, parts).result()
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def _naive_statistics(s):
+    """Character-by-character reference for the self-check"""
+    runs, progressions = [], []
+    i = 0
+    while i < len(s):
+        j = i
+        while j + 1 < len(s) and s[j + 1] == s[i]:
+            j += 1
+        if j > i:
+            runs.append((i, j - i + 1))
+        i = j + 1
+    i = 0
+    while i + 2 < len(s):
+        step = int(s[i + 1]) - int(s[i])
+        j = i + 1
+        while j + 1 < len(s) and int(s[j + 1]) - int(s[j]) == step:
+            j += 1
+        if j - i >= 2:
+            progressions.append((i, j - i + 1))
+        i = j
+    return runs, progressions
+
+def main():
+    import random
+    import time
+
+    print("=" * 80)
+    print("FUSED DIGIT STATISTICS")
+    print("=" * 80)
+
+    _, period = get_period_digits(99991)
+    runs, progressions = _naive_statistics(period)
+    agree = True
+    for chunk_size in (1, 7, 1000, CHUNK_SIZE):
+        stats = digit_statistics(period, limit=len(period), chunk_size=chunk_size)
+        agree &= [(r['position'], r['length']) for r in stats['runs']] == runs
+        agree &= [(p['position'], p['length']) for p in stats['progressions']] == progressions
+        agree &= stats['frequency'] == [period.count(str(d)) for d in range(10)]
+    print(f"1/99991 ({len(period)} digits): {len(runs)} runs, {len(progressions)} progressions, "
+          f"chunked scans agree with a character walk: {'YES' if agree else 'NO'}")
+
+    merged = parallel_digit_statistics(99991, workers=2, ranges=13, limit=len(period), kgram=3)
+    print(f"Merged ranges over 2 workers agree with one scan: "
+          f"{'YES' if merged == digit_statistics(period, limit=len(period), kgram=3) else 'NO'}")
+
+    n = 10**7 + 19
+    start_time = time.time()
+    stats = parallel_digit_statistics(n)
+    print(f"1/{n} ({stats['length']:,} digits, never stored) over {os.cpu_count()} core(s): "
+          f"{time.time() - start_time:.1f}s, longest run {stats['longest_run']}")
+
+    if np is not None:
+        rng = np.random.default_rng(5)
+        start_time = time.time()
+        stats = digit_statistics(rng.integers(0, 10, size=CHUNK_SIZE, dtype=np.uint8) for _ in range(24))
+        print(f"{stats['length']:,} streamed random digits: {time.time() - start_time:.1f}s, "
+              f"entropy {stats['entropy']:.4f} bits, longest run {stats['longest_run']['length']}, "
+              f"longest progression {stats['longest_progression']['length']}")
+    else:
+        rng = random.Random(5)
+        digits = ''.join(rng.choice('0123456789') for _ in range(10**6))
+        start_time = time.time()
+        stats = digit_statistics(digits)
+        print(f"{stats['length']:,} random digits (no numpy): {time.time() - start_time:.1f}s, "
+              f"entropy {stats['entropy']:.4f} bits")
+
+if __name__ == "__main__":
+    main()
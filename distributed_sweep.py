@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Distributed Sweeps - Period Table Sweeps Shared Out Through a Directory
+Any number of nodes on a shared filesystem claim chunk leases by atomic
+rename, steal leases whose holder has gone quiet, and leave result shards
+that a merge step combines into the period store
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+from period_store import (DEFAULT_DIRECTORY, DEFAULT_SHARD_SIZE, RECORD_DTYPE, PeriodStore,
+                          open_shard, shard_path, write_shard)
+from period_table import MULMOD_LIMIT
+from sweep import CHECKPOINT_NAME, period_context, period_record_kernel, prime_order_kernel
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - distributed sweeps need it
+    np = None
+
+LEASE_SECONDS = 300     # a lease not renewed for this long may be stolen
+POLL_SECONDS = 2.0
+
+# ============================================================================
+# MANIFEST DIRECTORY
+# ============================================================================
+#
+# manifest.json           limit and chunk size of the sweep
+# todo/<task>             unclaimed tasks (empty files)
+# leases/<task>@<node>    claimed tasks; the holder renews the mtime
+# done/<task>             finished tasks
+# primes/, records/       result shards (period store format), one per task
+# staging/<node>/         shards being written, renamed into place when whole
+#
+# Tasks are p_<lo> (orders of the large primes in a chunk) and r_<lo> (full
+# records of a chunk). r_<lo> needs the prime orders of every n below its
+# chunk's end, so it only becomes claimable once the p_ tasks up to there
+# are done.
+
+def _task(stage, lo):
+    return f"{stage}_{lo:013d}"
+
+def _parse(task):
+    stage, lo = task.split('_')
+    return stage, int(lo)
+
+def _chunks(limit, chunk_size):
+    hi = limit + 1
+    return [(lo, min(lo + chunk_size, hi)) for lo in range(0, hi, chunk_size)]
+
+def read_manifest(directory):
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        return json.load(f)
+
+def plan_sweep(directory, limit, chunk_size=DEFAULT_SHARD_SIZE):
+    """
+    Lay out a sweep of n <= limit in directory, once, before any node starts
+    Planning again with the same parameters is a no-op, so a crashed
+    coordinator can simply rerun it.
+    """
+    if limit + 1 > MULMOD_LIMIT:
+        raise ValueError("the period kernels handle n < 2^50")
+    try:
+        manifest = read_manifest(directory)
+    except FileNotFoundError:
+        manifest = None
+    if manifest is not None:
+        if manifest != {'limit': limit, 'chunk_size': chunk_size}:
+            raise ValueError(f"{directory} already holds a different sweep: {manifest}")
+        return manifest
+
+    for name in ('todo', 'leases', 'done', 'primes', 'records', 'staging'):
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+    for lo, _ in _chunks(limit, chunk_size):
+        for stage in ('p', 'r'):
+            open(os.path.join(directory, 'todo', _task(stage, lo)), 'w').close()
+
+    manifest = {'limit': limit, 'chunk_size': chunk_size}
+    path = os.path.join(directory, 'manifest.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f)
+    os.replace(path + '.tmp', path)  # written last: nodes wait for it
+    return manifest
+
+def sweep_status(directory):
+    """Task counts: {'todo', 'leased', 'done', 'total'}"""
+    counts = {name: len(os.listdir(os.path.join(directory, name)))
+              for name in ('todo', 'leases', 'done')}
+    manifest = read_manifest(directory)
+    return {'todo': counts['todo'], 'leased': counts['leases'], 'done': counts['done'],
+            'total': 2 * len(_chunks(manifest['limit'], manifest['chunk_size']))}
+
+# ============================================================================
+# LEASES
+# ============================================================================
+
+def _primes_done_to(directory, chunk_size):
+    """End of the run of finished p_ tasks from n = 0"""
+    done = sorted(_parse(task)[1] for task in os.listdir(os.path.join(directory, 'done'))
+                  if task.startswith('p_'))
+    end = 0
+    for lo in done:
+        if lo != end:
+            break
+        end += chunk_size
+    return end
+
+def _ready(task, primes_end, manifest):
+    stage, lo = _parse(task)
+    if stage == 'p':
+        return True
+    return min(lo + manifest['chunk_size'], manifest['limit'] + 1) <= primes_end
+
+def claim(directory, node, manifest, lease_seconds=LEASE_SECONDS):
+    """
+    Lease the next ready task for node; None if there is none right now
+    Unclaimed tasks go first, lowest n first, claimed by renaming them out
+    of todo/ (exactly one node wins). Otherwise a lease whose mtime is
+    older than lease_seconds is taken over: the node creates a fresh lease
+    of its own, so it never looks stale itself, then deletes the old one.
+    Of nodes racing for the same lease only the one whose delete succeeds
+    keeps its new lease. A holder that was only slow, not dead, finds its
+    lease gone and may finish the chunk too (it writes the same shard).
+    """
+    primes_end = _primes_done_to(directory, manifest['chunk_size'])
+    leases = os.path.join(directory, 'leases')
+
+    for task in sorted(os.listdir(os.path.join(directory, 'todo'))):
+        if not _ready(task, primes_end, manifest):
+            continue
+        lease = os.path.join(leases, f"{task}@{node}")
+        try:
+            os.rename(os.path.join(directory, 'todo', task), lease)
+        except FileNotFoundError:
+            continue  # another node got there first
+        return task, lease
+
+    now = time.time()
+    for name in sorted(os.listdir(leases)):
+        task = name.split('@')[0]
+        old = os.path.join(leases, name)
+        try:
+            if now - os.stat(old).st_mtime < lease_seconds or not _ready(task, primes_end, manifest):
+                continue
+        except FileNotFoundError:
+            continue
+        lease = os.path.join(leases, f"{task}@{node}")
+        if lease == old:
+            lease += '.retaken'  # the fresh lease needs a name of its own
+        try:
+            open(lease, 'x').close()
+        except FileExistsError:
+            continue
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            os.remove(lease)  # another node took it over first
+            continue
+        return task, lease
+    return None
+
+def _heartbeat(lease, interval, stop):
+    """Keep a lease fresh until stop is set (a stolen lease is left alone)"""
+    while not stop.wait(interval):
+        try:
+            os.utime(lease)
+        except FileNotFoundError:
+            return
+
+# ============================================================================
+# NODES
+# ============================================================================
+
+class _PrimeOrders:
+    """orders(primes) lookup over the finished p_ shards, memory-mapped as needed"""
+
+    def __init__(self, directory, chunk_size):
+        self.directory = os.path.join(directory, 'primes')
+        self.chunk_size = chunk_size
+        self.shards = {}
+
+    def __call__(self, q):
+        q = np.asarray(q, dtype=np.int64)
+        out = np.empty(len(q), dtype=np.uint64)
+        index = q // self.chunk_size
+        by_shard = np.argsort(index, kind='stable')
+        bounds = np.flatnonzero(np.diff(index[by_shard])) + 1
+        for sel in np.split(by_shard, bounds):
+            if not sel.size:
+                continue
+            i = int(index[sel[0]])
+            if i not in self.shards:
+                _, self.shards[i] = open_shard(shard_path(self.directory, i * self.chunk_size))
+            out[sel] = self.shards[i]['order'][q[sel] - i * self.chunk_size]
+        return out
+
+def _run_task(directory, node, task, manifest, context, orders):
+    stage, lo = _parse(task)
+    hi = min(lo + manifest['chunk_size'], manifest['limit'] + 1)
+    records = np.zeros(hi - lo, dtype=RECORD_DTYPE)
+    if stage == 'p':
+        prime_order_kernel(records, lo, lo, hi, context)
+    else:
+        period_record_kernel(records, lo, lo, hi, context, orders)
+
+    staging = os.path.join(directory, 'staging', node)
+    path = write_shard(staging, lo, records['order'], records['preperiod'],
+                       records['v2'], records['v5'], manifest['chunk_size'])
+    target = os.path.join(directory, 'primes' if stage == 'p' else 'records')
+    os.replace(path, shard_path(target, lo))
+
+def run_node(directory, node=None, lease_seconds=LEASE_SECONDS, max_tasks=None, progress=None):
+    """
+    Work on the sweep in directory until every task is done
+    node names this worker in the lease files (host and pid by default);
+    max_tasks stops it early. progress(task, status) follows along.
+    Returns the number of tasks this node finished.
+    """
+    if np is None:
+        raise ImportError("distributed sweeps need numpy")
+    node = node or f"{socket.gethostname()}-{os.getpid()}"
+    while not os.path.exists(os.path.join(directory, 'manifest.json')):
+        time.sleep(POLL_SECONDS)
+    manifest = read_manifest(directory)
+    context = period_context(manifest['limit'] + 1)
+    orders = _PrimeOrders(directory, manifest['chunk_size'])
+
+    finished = 0
+    while max_tasks is None or finished < max_tasks:
+        claimed = claim(directory, node, manifest, lease_seconds)
+        if claimed is None:
+            status = sweep_status(directory)
+            if status['done'] == status['total']:
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+
+        task, lease = claimed
+        stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(lease, lease_seconds / 3, stop), daemon=True)
+        beat.start()
+        try:
+            _run_task(directory, node, task, manifest, context, orders)
+        finally:
+            stop.set()
+            beat.join()
+        try:
+            os.rename(lease, os.path.join(directory, 'done', task))
+        except FileNotFoundError:
+            pass  # stolen meanwhile; the thief writes the same shard
+        finished += 1
+        if progress:
+            progress(task, sweep_status(directory))
+    return finished
+
+# ============================================================================
+# MERGE
+# ============================================================================
+
+def merge_sweep(directory, store_directory=DEFAULT_DIRECTORY, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Combine the record shards of a finished sweep into the period store
+    The swept n are written from n = 0 in shards of shard_size records
+    before any old shard goes: old shards are dropped only once the new
+    ones are in place, so a merge that dies part way can simply be run
+    again. Records the store holds past the sweep's limit are kept.
+    Returns the PeriodStore.
+    """
+    status = sweep_status(directory)
+    if status['done'] != status['total']:
+        raise ValueError(f"sweep in {directory} is not finished: {status}")
+    manifest = read_manifest(directory)
+    chunk_size = manifest['chunk_size']
+    results = os.path.join(directory, 'records')
+    end = manifest['limit'] + 1
+    old = PeriodStore(store_directory).headers if os.path.isdir(store_directory) else []
+
+    # A shard running past the sweep keeps its tail as a shard of its own
+    for h in old:
+        if h['lo'] < end < h['hi']:
+            _, records = open_shard(h['path'])
+            tail = records[end - h['lo']:]
+            write_shard(store_directory, end, tail['order'], tail['preperiod'],
+                        tail['v2'], tail['v5'], h['shard_size'])
+            records = tail = None
+
+    written = set()
+    for lo, hi in _chunks(manifest['limit'], shard_size):
+        parts = []
+        for chunk_lo in range(lo - lo % chunk_size, hi, chunk_size):
+            _, records = open_shard(shard_path(results, chunk_lo))
+            parts.append(records[max(lo - chunk_lo, 0):hi - chunk_lo])
+        records = np.concatenate(parts)
+        written.add(write_shard(store_directory, lo, records['order'], records['preperiod'],
+                                records['v2'], records['v5'], shard_size))
+
+    # Old shards inside the swept range (those not already replaced in place)
+    for h in old:
+        if h['lo'] < end and h['path'] not in written:
+            os.remove(h['path'])
+    if os.path.exists(os.path.join(store_directory, CHECKPOINT_NAME)):
+        os.remove(os.path.join(store_directory, CHECKPOINT_NAME))
+    return PeriodStore(store_directory)
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    import multiprocessing
+    import tempfile
+
+    from period_table import build_period_table
+    from sweep import sweep_period_store
+
+    print("=" * 80)
+    print("DISTRIBUTED PERIOD SWEEP")
+    print("=" * 80)
+
+    limit = 3 * 10**6
+    extra = 5 * 10**5
+    reference = build_period_table(limit + extra)
+
+    with tempfile.TemporaryDirectory() as directory:
+        work = os.path.join(directory, 'sweep')
+        plan_sweep(work, limit, chunk_size=250000)
+
+        # A node that claimed a task and died: its lease goes stale
+        claimed = claim(work, 'lost-node', read_manifest(work))
+        os.utime(claimed[1], (time.time() - 60, time.time() - 60))
+
+        # A stale lease is taken over once, and the new lease starts fresh
+        with tempfile.TemporaryDirectory() as single:
+            manifest = plan_sweep(single, 999, chunk_size=1000)
+            lost = claim(single, 'lost-node', manifest)
+            os.utime(lost[1], (time.time() - 60, time.time() - 60))
+            first = claim(single, 'thief-1', manifest, 30)
+            second = claim(single, 'thief-2', manifest, 30)
+            fresh = time.time() - os.stat(first[1]).st_mtime < 30
+            print(f"Stale lease {lost[0]} taken over by thief-1 with a fresh lease: "
+                  f"{'YES' if first[0] == lost[0] and fresh else 'NO'}, "
+                  f"not again by thief-2: {'YES' if second is None else 'NO'}, "
+                  f"leases left: {sorted(os.listdir(os.path.join(single, 'leases')))}")
+
+        start_time = time.time()
+        nodes = [multiprocessing.Process(target=run_node, args=(work, f"node-{i}", 30))
+                 for i in range(3)]
+        for node in nodes:
+            node.start()
+        for node in nodes:
+            node.join()
+        status = sweep_status(work)
+        print(f"3 node processes swept n <= {limit:,} in {time.time() - start_time:.2f}s: "
+              f"{status['done']} of {status['total']} tasks done "
+              f"(including {claimed[0]}, stolen from a dead node)")
+
+        def matches(store):
+            return all(np.array_equal(store.column('order', index), reference.order[h['lo']:h['hi']])
+                       and np.array_equal(store.column('v2', index), reference.v2[h['lo']:h['hi']])
+                       for index, h in enumerate(store.headers))
+
+        # The store already reaches past the sweep, in shards on another grid
+        store_directory = os.path.join(directory, 'store')
+        sweep_period_store(limit + extra, store_directory, shard_size=700000)
+
+        # A merge that fails part way (a result shard has gone) loses nothing
+        missing = shard_path(os.path.join(work, 'records'), 2 * 10**6)
+        os.rename(missing, missing + '.away')
+        try:
+            merge_sweep(work, store_directory, shard_size=10**6)
+        except FileNotFoundError:
+            pass
+        os.rename(missing + '.away', missing)
+        store = PeriodStore(store_directory)
+        print(f"Merge failing part way: store still reaches {store.limit:,}, "
+              f"matches sieve: {'YES' if store.limit == limit + extra and matches(store) else 'NO'}")
+
+        store = merge_sweep(work, store_directory, shard_size=10**6)
+        print(f"Merged into {len(store.headers)} store shards, reaching {store.limit:,} "
+              f"(records past the sweep kept), matches sieve: {'YES' if matches(store) else 'NO'}")
+
+def _usage():
+    print("usage: distributed_sweep.py plan DIR LIMIT [CHUNK_SIZE]\n"
+          "       distributed_sweep.py node DIR\n"
+          "       distributed_sweep.py merge DIR [STORE_DIR]\n"
+          "       distributed_sweep.py            (self-check)")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 1:
+        main()
+    elif sys.argv[1] == 'plan' and len(sys.argv) in (4, 5):
+        plan_sweep(sys.argv[2], int(sys.argv[3]), *[int(a) for a in sys.argv[4:]])
+    elif sys.argv[1] == 'node' and len(sys.argv) == 3:
+        run_node(sys.argv[2], progress=lambda task, s: print(f"{task} done ({s['done']}/{s['total']})"))
+    elif sys.argv[1] == 'merge' and len(sys.argv) in (3, 4):
+        print(f"Period store limit: {merge_sweep(*sys.argv[2:]).limit}")
+    else:
+        _usage()
@@ -8,88 +8,50 @@ with periods 8, 22, 43
 import sys
 from collections import Counter
 
-def get_period_digits(n, max_digits=500):
-    """Extract repeating period digits from 1/n"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < max_digits:
-        if remainder in seen:
-            period_start = seen[remainder]
-            period = ''.join(decimal_digits[period_start:])
-            return period_start, period
-        
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    
-    return 0, ''.join(decimal_digits)
-
-def find_period_length(n, max_length=500):
-    """Find period length using multiplicative order"""
-    remainders = {}
-    remainder = 1
-    position = 0
-    
-    while remainder != 0 and position < max_length:
-        if remainder in remainders:
-            return position - remainders[remainder]
-        remainders[remainder] = position
-        remainder = (remainder * 10) % n
-        position += 1
-    return 0
-
-def to_base(num, base):
-    """Convert number to given base"""
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        digits.append(str(num % base))
-        num //= base
-    return ''.join(reversed(digits))
+from base_conversion import to_base_batch
+from period_store import search_periods
+from periods import Period
 
-def analyze_patterns(n, period_str):
-    """Analyze patterns for a given number"""
-    if not period_str or period_str == '0':
+def analyze_patterns(n, period, packed=None):
+    """
+    Analyze patterns for a given number (period is a periods.Period)
+    packed optionally holds the period integer's digits in bases 2, 3
+    and 8 (from to_base_batch), so a population converts in one batch.
+    """
+    if not period or period.value == 0:
         return None
     
-    period_int = int(period_str)
-    digits = [int(d) for d in period_str]
-    digit_sum = sum(digits)
+    digit_sum = period.digit_sum
+    
+    if packed is None:
+        packed = {base: values[0] for base, values in to_base_batch([period.value], (2, 3, 8)).items()}
     
     # Binary analysis
-    binary = bin(period_int)[2:]
-    ones = binary.count('1')
-    zeros = binary.count('0')
+    ones = packed[2].count(1)
+    zeros = len(packed[2]) - ones
     binary_balanced = (ones == zeros)
     
     # Ternary analysis
-    ternary = to_base(period_int, 3)
-    ternary_doubles = (len(ternary) == 2 * len(period_str))
+    ternary_length = len(packed[3])
+    ternary_doubles = (ternary_length == 2 * len(period))
     
     # Octal analysis
-    octal = oct(period_int)[2:]
-    octal_is_24 = (len(octal) == 24)
+    octal_length = len(packed[8])
+    octal_is_24 = (octal_length == 24)
     
     # Digit sum analysis
     digit_sum_has_9_factor = (digit_sum % 9 == 0)
     digit_sum_has_3_squared = (digit_sum % 9 == 0) and ((digit_sum // 9) % 1 == 0)
     
     # Check for 729
-    contains_729 = ('729' in period_str)
+    contains_729 = ('729' in period)
     
     # All 10 digits present
-    all_digits = (len(set(digits)) == 10)
+    all_digits = all(period.counts)
     
     return {
         'n': n,
-        'period_length': len(period_str),
+        'period_length': len(period),
         'digit_sum': digit_sum,
         'digit_sum_div_9': digit_sum_has_9_factor,
         'binary_balanced': binary_balanced,
@@ -99,25 +61,31 @@ def analyze_patterns(n, period_str):
         'all_digits': all_digits,
         'binary_ones': ones,
         'binary_zeros': zeros,
-        'ternary_length': len(ternary),
-        'octal_length': len(octal),
+        'ternary_length': ternary_length,
+        'octal_length': octal_length,
     }
 
 def find_numbers_with_period(target_period, max_n=1000):
     """Find all numbers up to max_n with given period"""
-    print(f"\nSearching for numbers with period {target_period} (up to {max_n})...")
-    results = []
-    
-    for n in range(2, max_n + 1):
-        if n % 100 == 0:
-            print(f"  Progress: {n}/{max_n}", end='\r')
-        
-        period_length = find_period_length(n)
-        if period_length == target_period:
-            results.append(n)
-    
-    print(f"  Found {len(results)} numbers" + " " * 20)
-    return results
+    return find_numbers_with_periods([target_period], max_n)[target_period]
+
+def find_numbers_with_periods(target_periods, max_n=1000, limits=None):
+    """
+    Find all numbers up to max_n with each given period, every period computed once
+    limits gives a period its own, lower, max_n (period -> max_n)
+    """
+    targets = sorted(set(target_periods))
+    limits = limits or {}
+    print(f"\nSearching for numbers with periods {', '.join(str(t) for t in targets)} (up to {max_n})...")
+    found = search_periods(
+        targets, max_n,
+        progress=lambda done, total: print(f"  Sweeping periods: {100 * done // total}%", end='\r'))
+    
+    for target in targets:
+        cap = min(limits.get(target, max_n), max_n)
+        found[target] = [n for n in found[target] if n <= cap]
+        print(f"  Period {target}: found {len(found[target])} numbers (up to {cap})" + " " * 20)
+    return found
 
 def compare_patterns(numbers_list, target_n, target_name):
     """Compare patterns of target number vs all others with same period"""
@@ -129,9 +97,12 @@ def compare_patterns(numbers_list, target_n, target_name):
     all_patterns = []
     target_patterns = None
     
-    for n in numbers_list:
-        _, period_str = get_period_digits(n)
-        patterns = analyze_patterns(n, period_str)
+    # One batch conversion for the whole population (shared power tables)
+    periods = [Period(n) for n in numbers_list]
+    packed = to_base_batch([period.value for period in periods], (2, 3, 8))
+    
+    for i, n in enumerate(numbers_list):
+        patterns = analyze_patterns(n, periods[i], {base: packed[base][i] for base in packed})
         
         if patterns:
             all_patterns.append(patterns)
@@ -200,9 +171,12 @@ def main():
         (43, 173, "Feynman Limit", 500),
     ]
     
+    # One pass over the periods for every target, each cut to its own range
+    limits = {period: max_search for period, *_, max_search in investigations}
+    found = find_numbers_with_periods(limits, max(limits.values()), limits)
+    
     for period, target_n, name, max_search in investigations:
-        numbers_with_period = find_numbers_with_period(period, max_search)
-        compare_patterns(numbers_with_period, target_n, name)
+        compare_patterns(found[period], target_n, name)
     
     print("\n" + "="*80)
     print("CONCLUSION")
@@ -6,37 +6,8 @@ Mathematical explanation for why ternary length = 2× period for 92 and 173
 
 import math
 
-def get_period_digits(n, max_digits=500):
-    """Extract repeating period digits from 1/n"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < max_digits:
-        if remainder in seen:
-            period_start = seen[remainder]
-            period = ''.join(decimal_digits[period_start:])
-            return period_start, period
-        
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    
-    return 0, ''.join(decimal_digits)
-
-def to_base(num, base):
-    """Convert number to given base"""
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        digits.append(str(num % base))
-        num //= base
-    return ''.join(reversed(digits))
+from base_conversion import representation, to_base
+from periods import get_period_digits
 
 def analyze_base_relationship(n, name):
     """Analyze relationship between decimal period and ternary length"""
@@ -57,11 +28,10 @@ def analyze_base_relationship(n, name):
     print(f"Period length: {period_length}")
     print(f"Period as integer: {period_int}")
     
-    # Convert to ternary
-    ternary = to_base(period_int, 3)
-    ternary_length = len(ternary)
+    # Ternary length and preview without converting the whole integer
+    ternary_length, ternary_prefix = representation(period_int, 3, 60)
     
-    print(f"\nTernary: {ternary[:60]}{'...' if len(ternary) > 60 else ''}")
+    print(f"\nTernary: {ternary_prefix}{'...' if ternary_length > 60 else ''}")
     print(f"Ternary length: {ternary_length}")
     
     # Calculate expected ternary length
@@ -81,12 +51,9 @@ def analyze_base_relationship(n, name):
     # Analyze powers of 3
     print(f"\n{'POWER OF 3 ANALYSIS':-^80}")
     
-    # Find largest power of 3 less than period_int
-    power_of_3 = 1
-    exponent = 0
-    while power_of_3 * 3 <= period_int:
-        power_of_3 *= 3
-        exponent += 1
+    # Largest power of 3 not above period_int: 3^(ternary length - 1)
+    exponent = ternary_length - 1
+    power_of_3 = 3 ** exponent
     
     print(f"Largest 3^k < period_int: 3^{exponent} = {power_of_3}")
     print(f"Next power: 3^{exponent+1} = {power_of_3 * 3}")
@@ -118,6 +85,7 @@ def analyze_base_relationship(n, name):
         print(f"Period_int is NOT divisible by 3")
     
     # Check if ternary representation has special structure
+    ternary = to_base(period_int, 3)
     digit_count = {str(i): ternary.count(str(i)) for i in range(3)}
     print(f"\nTernary digit distribution:")
     for digit, count in digit_count.items():
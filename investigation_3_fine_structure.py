@@ -6,37 +6,7 @@ Tests if the actual NIST value preserves the dimension-8 encoding
 
 from math import gcd
 
-def get_period_digits(n, max_digits=500):
-    """Extract repeating period digits from 1/n"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < max_digits:
-        if remainder in seen:
-            period_start = seen[remainder]
-            period = ''.join(decimal_digits[period_start:])
-            return period_start, period
-        
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    
-    return 0, ''.join(decimal_digits)
-
-def to_base(num, base):
-    """Convert number to given base"""
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        digits.append(str(num % base))
-        num //= base
-    return ''.join(reversed(digits))
+from periods import Period, get_period_digits
 
 def analyze_rational(numerator, denominator, name):
     """Analyze a rational number p/q"""
@@ -60,8 +30,8 @@ def analyze_rational(numerator, denominator, name):
     print(f"\nPeriod structure determined by denominator: {num_reduced}")
     
     # Analyze the denominator
-    _, period_str = get_period_digits(num_reduced)
-    period_length = len(period_str) if period_str else 0
+    period = Period(num_reduced)
+    period_length = len(period)
     
     if period_length == 0:
         print("Could not compute period")
@@ -71,7 +41,7 @@ def analyze_rational(numerator, denominator, name):
     print(f"PERIOD ANALYSIS")
     print(f"{'-'*80}")
     
-    print(f"\nPeriod: {period_str[:70]}{'...' if len(period_str) > 70 else ''}")
+    print(f"\nPeriod: {period[:70]}{'...' if len(period) > 70 else ''}")
     print(f"Period length: {period_length}")
     
     # Compare to dimension 8
@@ -87,10 +57,9 @@ def analyze_rational(numerator, denominator, name):
         print(f"The 0.036 correction DESTROYS the encoding")
     
     # Digit analysis
-    if period_str and period_str != '0':
-        period_int = int(period_str)
-        digits = [int(d) for d in period_str]
-        digit_sum = sum(digits)
+    if period and period.value != 0:
+        period_int = period.value
+        digit_sum = period.digit_sum
         
         print(f"\nDigit sum: {digit_sum}")
         if digit_sum % 9 == 0:
@@ -99,7 +68,7 @@ def analyze_rational(numerator, denominator, name):
                 print(f"  Contains factor 3² ✓")
         
         # Check for 729
-        if '729' in period_str:
+        if '729' in period:
             print(f"\n⭐ Contains '729' (3^6, ternary Golay codewords)!")
         
         # Binary analysis
@@ -116,7 +85,7 @@ def analyze_rational(numerator, denominator, name):
     return {
         'period_length': period_length,
         'matches_8': (period_length == 8),
-        'period_str': period_str,
+        'period_str': str(period),
         'denominator': num_reduced,
     }
 
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Number Theory Engine - Factorization and Multiplicative Orders
+Computes ord_n(b) from the factorization of n via the Carmichael function
+"""
+
+import math
+import random
+import time
+
+# ============================================================================
+# PRIMALITY
+# ============================================================================
+
+# Miller-Rabin with these bases is exact for n < 3.3 x 10^24
+MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+def is_prime(n):
+    """Miller-Rabin primality test (deterministic below 3.3 x 10^24)"""
+    if n < 2:
+        return False
+    for p in MR_BASES:
+        if n % p == 0:
+            return n == p
+
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+# ============================================================================
+# FACTORIZATION
+# ============================================================================
+
+TRIAL_BOUND = 1000
+SMALL_PRIMES = [p for p in range(2, TRIAL_BOUND) if all(p % q for q in range(2, math.isqrt(p) + 1))]
+
+# Below this size plain trial division is the fastest method
+TRIAL_DIVISION_LIMIT = 10**7
+
+# Above this size Pollard rho gives way to ECM / SIQS (factor_engines.py)
+RHO_LIMIT = 10**20
+
+# With a time limit, cofactors above this size are given up on at once:
+# a single primality test on them would already blow the budget
+TIMED_BIT_LIMIT = 2048
+
+def integer_root(n, k):
+    """Largest r with r^k <= n"""
+    if n < 2:
+        return n
+    r = 1 << ((n.bit_length() + k - 1) // k)
+    while True:
+        s = ((k - 1) * r + n // r ** (k - 1)) // k
+        if s >= r:
+            return r
+        r = s
+
+def perfect_power(n):
+    """(root, k) with root^k = n for a prime k, or None"""
+    for k in SMALL_PRIMES:
+        if k > n.bit_length():
+            break
+        r = integer_root(n, k)
+        if r ** k == n:
+            return r, k
+    return None
+
+def _trial_division(n, factors, bound=None):
+    """Divide out primes up to bound (all of n's factors if bound is None); return the rest"""
+    if bound is None:
+        d = 2
+        while d * d <= n:
+            while n % d == 0:
+                factors[d] = factors.get(d, 0) + 1
+                n //= d
+            d += 1 if d == 2 else 2
+        if n > 1:
+            factors[n] = factors.get(n, 0) + 1
+        return 1
+
+    for p in SMALL_PRIMES:
+        if p > bound:
+            break
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+    return n
+
+def _pollard_brent(n, deadline=None):
+    """
+    Find a nontrivial factor of an odd composite n (Brent's Pollard rho)
+    Returns None if the deadline (a time.time() value) passes first
+    """
+    while True:
+        y = random.randrange(1, n)
+        c = random.randrange(1, n)
+        m = 128
+        g = r = q = 1
+
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+            if deadline is not None and time.time() > deadline:
+                return None
+
+        if g == n:
+            # Batched gcd overshot - backtrack one step at a time
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+
+        if g != n:
+            return g
+
+def choose_method(m):
+    """Factoring method for a composite cofactor m with no factors below TRIAL_BOUND"""
+    if m < TRIAL_DIVISION_LIMIT:
+        return 'trial'
+    if m < RHO_LIMIT:
+        return 'rho'
+    return 'ecm'
+
+def split(m, deadline=None, workers=1):
+    """A nontrivial factor of the composite m, or None on timeout"""
+    method = choose_method(m)
+    if method == 'trial':
+        for d in range(TRIAL_BOUND | 1, math.isqrt(m) + 1, 2):
+            if m % d == 0:
+                return d
+    if method == 'ecm':
+        from factor_engines import find_factor
+        return find_factor(m, deadline, workers)
+    return _pollard_brent(m, deadline)
+
+def factorint(n, max_time=None, workers=1):
+    """
+    Prime factorization of n as a dict {prime: exponent}
+    The method is picked by size: trial division for small n, otherwise
+    trial division by primes below 1000, then perfect-power detection,
+    Miller-Rabin and Pollard rho (Brent) on the cofactors, with ECM and
+    SIQS taking over for cofactors above RHO_LIMIT.
+    Returns None if it takes longer than max_time seconds (or, with a
+    max_time, if a cofactor is too large to even test for primality);
+    without one it always completes. workers is handed to the ECM / SIQS
+    engines for their process pool.
+    """
+    factors = {}
+    if n < 2:
+        return factors
+    if n < TRIAL_DIVISION_LIMIT:
+        _trial_division(n, factors)
+        return dict(sorted(factors.items()))
+
+    deadline = None if max_time is None else time.time() + max_time
+    n = _trial_division(n, factors, TRIAL_BOUND)
+
+    stack = [(n, 1)] if n > 1 else []
+    while stack:
+        m, multiplicity = stack.pop()
+        if deadline is not None and m.bit_length() > TIMED_BIT_LIMIT:
+            return None
+        if m < TRIAL_BOUND ** 2 or is_prime(m):
+            factors[m] = factors.get(m, 0) + multiplicity
+            continue
+        power = perfect_power(m)
+        if power:
+            stack.append((power[0], multiplicity * power[1]))
+            continue
+        d = split(m, deadline, workers)
+        if d is None:
+            return None
+        stack.append((d, multiplicity))
+        stack.append((m // d, multiplicity))
+
+    return dict(sorted(factors.items()))
+
+# ============================================================================
+# CARMICHAEL FUNCTION AND MULTIPLICATIVE ORDER
+# ============================================================================
+
+def _lambda_factorization(factors):
+    """Factorization {prime: exponent} of the Carmichael function lambda(n)"""
+    result = {}
+
+    def merge(p, e):
+        if e > result.get(p, 0):
+            result[p] = e
+
+    for p, k in factors.items():
+        if p == 2:
+            # lambda(2) = 1, lambda(4) = 2, lambda(2^k) = 2^(k-2) for k >= 3
+            if k >= 2:
+                merge(2, k - 2 if k >= 3 else 1)
+            continue
+        if k > 1:
+            merge(p, k - 1)
+        factors_below = factorint(p - 1)
+        if factors_below is None:
+            raise ArithmeticError(f"could not factor {p - 1}")
+        for q, e in factors_below.items():
+            merge(q, e)
+
+    return result
+
+def carmichael_lambda(n):
+    """Carmichael function lambda(n): exponent of the group (Z/nZ)*"""
+    result = 1
+    for q, e in _lambda_factorization(factorint(n)).items():
+        result *= q ** e
+    return result
+
+def multiplicative_order(base, n):
+    """
+    Calculate ord_n(base) - multiplicative order
+    Factors shared by base and n are removed first (they only cause a
+    pre-period); returns 0 if nothing is left, i.e. 1/n terminates in base.
+    """
+    g = math.gcd(base, n)
+    while g > 1:
+        n //= g
+        g = math.gcd(base, n)
+    if n == 1:
+        return 0
+
+    lam_factors = _lambda_factorization(factorint(n))
+    order = 1
+    for q, e in lam_factors.items():
+        order *= q ** e
+
+    # ord_n(base) divides lambda(n); strip each prime while base^(order/q) = 1
+    base %= n
+    for q in lam_factors:
+        while order % q == 0 and pow(base, order // q, n) == 1:
+            order //= q
+    return order
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    print("=" * 80)
+    print("MULTIPLICATIVE ORDER ENGINE")
+    print("=" * 80)
+
+    for n in [137, 92, 173, 34259, 137036]:
+        print(f"ord_{n}(10) = {multiplicative_order(10, n)}")
+    print(f"ord_92(3) = {multiplicative_order(3, 92)}")
+
+    big = 10**18 + 9
+    print(f"\nfactorint({big}) = {factorint(big)}")
+    print(f"ord_{big}(10) = {multiplicative_order(10, big)}")
+
+    # Unbounded calls always complete; a timed one gives up with None
+    wide = (10**12 + 39) * (3 * 10**92 + 17)
+    print(f"\nfactorint of a {len(str(wide))}-digit n: {factorint(wide)}")
+    balanced = (10**54 + 31) * (2 * 10**54 + 39)
+    print(f"factorint of a 109-digit semiprime with max_time=0.5: {factorint(balanced, max_time=0.5)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Pattern Search - Multi-Pattern Matching and Palindromes over Period Digits
+Aho-Corasick automaton built once from a catalog of decimal strings, and
+Manacher's linear-time scan for every maximal palindrome
+"""
+
+from collections import deque
+
+# ============================================================================
+# AHO-CORASICK AUTOMATON
+# ============================================================================
+
+class PatternMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of patterns
+    The goto function is completed into a full transition table per state
+    (missing edges resolved through failure links at build time), so the
+    scan is one dictionary lookup per character. Each state keeps the
+    patterns ending there plus a link to the next state with output.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self.alphabet = sorted({ch for p in self.patterns for ch in p})
+        self.max_length = max((len(p) for p in self.patterns), default=0)
+
+        # Trie
+        self.delta = [{}]
+        self.output = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                if ch not in self.delta[state]:
+                    self.delta.append({})
+                    self.output.append([])
+                    self.delta[state][ch] = len(self.delta) - 1
+                state = self.delta[state][ch]
+            self.output[state].append(index)
+
+        # Failure links (breadth first), completing delta as we go
+        self.fail = [0] * len(self.delta)
+        self.output_link = [-1] * len(self.delta)
+        queue = deque()
+        for ch in self.alphabet:
+            child = self.delta[0].get(ch)
+            if child is None:
+                self.delta[0][ch] = 0
+            else:
+                queue.append(child)
+        while queue:
+            state = queue.popleft()
+            fallback = self.fail[state]
+            self.output_link[state] = (fallback if self.output[fallback]
+                                       else self.output_link[fallback])
+            for ch in self.alphabet:
+                child = self.delta[state].get(ch)
+                if child is None:
+                    self.delta[state][ch] = self.delta[fallback][ch]
+                else:
+                    self.fail[child] = self.delta[fallback][ch]
+                    queue.append(child)
+
+    def iter_matches(self, text, cyclic=False):
+        """
+        Yield (start, pattern) for every occurrence, in order of match end
+        With cyclic=True the text is treated as a cycle (a repetend): matches
+        running across the end back into the start are reported too, with
+        start < len(text).
+        """
+        length = len(text)
+        if cyclic and length and self.max_length > 1:
+            wrap = self.max_length - 1
+            text = text + (text * (wrap // length + 1))[:wrap]
+
+        delta, output, output_link, patterns = self.delta, self.output, self.output_link, self.patterns
+        state = 0
+        for end, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            hit = state if output[state] else output_link[state]
+            while hit > 0:
+                for index in output[hit]:
+                    start = end - len(patterns[index]) + 1
+                    if start < length:
+                        yield start, patterns[index]
+                hit = output_link[hit]
+
+    def iter_chunk_matches(self, chunks):
+        """
+        iter_matches over a text arriving in chunks (a period generated on
+        the fly); the automaton state carries across chunk boundaries
+        """
+        delta, output, output_link, patterns = self.delta, self.output, self.output_link, self.patterns
+        state = 0
+        offset = 0
+        for chunk in chunks:
+            for end, ch in enumerate(chunk, offset):
+                state = delta[state].get(ch, 0)
+                hit = state if output[state] else output_link[state]
+                while hit > 0:
+                    for index in output[hit]:
+                        yield end - len(patterns[index]) + 1, patterns[index]
+                    hit = output_link[hit]
+            offset += len(chunk)
+
+    def find_all(self, text, cyclic=False):
+        """{pattern: [start positions]} for every pattern that occurs"""
+        found = {}
+        for start, pattern in self.iter_matches(text, cyclic):
+            found.setdefault(pattern, []).append(start)
+        for positions in found.values():
+            positions.sort()
+        return found
+
+# ============================================================================
+# PALINDROMES (MANACHER)
+# ============================================================================
+
+def palindrome_radii(s):
+    """
+    Manacher over s with separators between characters
+    radii[i] is the length of the maximal palindrome centred at position
+    i of the interleaved sequence (odd i: on a character, even i: between
+    two), which starts at (i - radii[i]) // 2 in s. Linear time.
+    """
+    size = 2 * len(s) + 1
+    t = [None] * size
+    t[1::2] = s
+    radii = [0] * size
+    center = right = 0
+    for i in range(size):
+        r = min(right - i, radii[2 * center - i]) if i < right else 0
+        while i - r > 0 and i + r + 1 < size and t[i - r - 1] == t[i + r + 1]:
+            r += 1
+        radii[i] = r
+        if i + r > right:
+            center, right = i, i + r
+    return radii
+
+def maximal_palindromes(s, min_length=2):
+    """[(start, length)] of every maximal palindrome (one per centre), by position"""
+    found = []
+    for i, length in enumerate(palindrome_radii(s)):
+        if length >= min_length:
+            found.append(((i - length) // 2, length))
+    found.sort()
+    return found
+
+def cyclic_palindromes(s, min_length=2):
+    """
+    Maximal palindromes of the periodic string ...sss... (every rotation)
+    Each is reported once as (start, length) with 0 <= start < len(s);
+    lengths are capped at len(s), since a longer one is a whole rotation
+    that is itself a palindrome and extends without end.
+    """
+    n = len(s)
+    if n == 0:
+        return []
+    radii = palindrome_radii(s + s + s)
+    found = set()
+    for i in range(2 * n, 4 * n):  # centres in the middle copy
+        length = radii[i]
+        if length > n:
+            length = n if (n - length) % 2 == 0 else n - 1
+        if length >= min_length:
+            found.add((((i - length) // 2) % n, length))
+    return sorted(found)
+
+def stream_palindromes(chunks, min_length=2, max_length=1000):
+    """
+    Maximal palindromes of a period arriving in chunks, as (start, length)
+    in order of their centre. Only a window of about 2 * max_length characters plus the current
+    chunk is held, so the period never has to fit in memory twice (or at
+    all). Palindromes longer than max_length are reported cut down to
+    at most max_length around their centre.
+    """
+    half = max_length // 2 + 1
+    buffer = ''
+    offset = 0      # position of buffer[0] in the period
+    finished = 0    # centres before this position (in s) are reported
+    exhausted = False
+    chunks = iter(chunks)
+    while not exhausted:
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer += chunk
+        end = offset + len(buffer)
+        limit = end if exhausted else end - half
+        if limit <= finished:
+            continue
+
+        radii = palindrome_radii(buffer)
+        for i in range(2 * (finished - offset), 2 * (limit - offset)):
+            length = radii[i]
+            if length > max_length:
+                length = max_length if (length - max_length) % 2 == 0 else max_length - 1
+            if length >= min_length:
+                yield offset + (i - length) // 2, length
+
+        finished = limit
+        keep = max(finished - max_length - 1 - offset, 0)
+        buffer = buffer[keep:]
+        offset += keep
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    import random
+    import time
+
+    from periods import get_period_digits
+
+    print("=" * 80)
+    print("AHO-CORASICK PATTERN SEARCH")
+    print("=" * 80)
+
+    rng = random.Random(3)
+    catalog = sorted({str(rng.randrange(1, 10**rng.randrange(1, 7))) for _ in range(500)})
+    _, period = get_period_digits(99991)
+
+    start_time = time.time()
+    matcher = PatternMatcher(catalog)
+    build_time = time.time() - start_time
+
+    start_time = time.time()
+    found = matcher.find_all(period)
+    scan_time = time.time() - start_time
+
+    start_time = time.time()
+    naive = {}
+    for pattern in catalog:
+        pos = period.find(pattern)
+        while pos != -1:
+            naive.setdefault(pattern, []).append(pos)
+            pos = period.find(pattern, pos + 1)
+    naive_time = time.time() - start_time
+
+    print(f"{len(catalog)} patterns over a {len(period)}-digit period: build {build_time:.3f}s, "
+          f"scan {scan_time:.3f}s (str.find per pattern {naive_time:.3f}s), "
+          f"agree: {'YES' if found == naive else 'NO'}")
+
+    doubled = period + period
+    cyclic = matcher.find_all(period, cyclic=True)
+    expected = {}
+    for pattern in catalog:
+        positions = [i for i in range(len(period)) if doubled.startswith(pattern, i)]
+        if positions:
+            expected[pattern] = positions
+    print(f"Cyclic matches across the period boundary agree: {'YES' if cyclic == expected else 'NO'}")
+
+    start_time = time.time()
+    palindromes = maximal_palindromes(period, 5)
+    longest = max(palindromes, key=lambda p: p[1])
+    print(f"\nMaximal palindromes (length >= 5) in 1/99991: {len(palindromes)} "
+          f"in {time.time() - start_time:.3f}s, longest {period[longest[0]:longest[0] + longest[1]]}")
+    streamed = list(stream_palindromes((period[i:i + 4096] for i in range(0, len(period), 4096)), 5, 1000))
+    print(f"Streaming scan agrees: {'YES' if sorted(streamed) == palindromes else 'NO'}")
+    print(f"Cyclic palindromes (length >= 5): {len(cyclic_palindromes(period, 5))}")
+
+if __name__ == "__main__":
+    main()
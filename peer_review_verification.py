@@ -6,6 +6,8 @@ Testing reviewer's assertions against our original findings
 
 import math
 
+from number_theory import multiplicative_order
+
 print("="*80)
 print("EMERGENCY VERIFICATION OF PEER REVIEW CLAIMS")
 print("="*80)
@@ -46,25 +48,8 @@ print("-"*80)
 
 def get_period_base_n(denominator, base):
     """Calculate period length in any base"""
-    # Remove factors of base from denominator
-    temp_denom = denominator
-    while math.gcd(temp_denom, base) > 1:
-        g = math.gcd(temp_denom, base)
-        temp_denom //= g
-    
-    if temp_denom == 1:
-        return 0  # Terminating
-    
-    # Calculate multiplicative order
-    order = 1
-    remainder = base % temp_denom
-    while remainder != 1:
-        remainder = (remainder * base) % temp_denom
-        order += 1
-        if order > temp_denom:  # Safety
-            return -1
-    
-    return order
+    # Factors of base only give a pre-period; ord of what remains is the period
+    return multiplicative_order(base, denominator)
 
 # Test decimal period of 1/92
 period_92_decimal = get_period_base_n(92, 10)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Period Store - Persistent Memory-Mapped Period Table
+Fixed-width records of ord_n(10), pre-period start and the 2/5 valuations
+for n = 0..N, split into range shards with a small header each (64-bit
+orders, so populations past 2^32 fit)
+"""
+
+import bisect
+import glob
+import os
+import struct
+
+from period_table import build_period_table
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - the store needs it, tables do not
+    np = None
+
+# ============================================================================
+# FILE FORMAT
+# ============================================================================
+#
+# Each shard file covers n in [lo, hi):
+#   64-byte header: magic, version, record size, lo, hi, shard size
+#   (hi - lo) records of 12 bytes, record i describing n = lo + i:
+#     order     uint64  period length of 1/n (0 if 1/n terminates)
+#     preperiod uint8   position where the period starts
+#     v2, v5    uint8   2-adic and 5-adic valuations of n
+#     (1 pad byte)
+# Version 1 shards (uint32 orders) are ignored and swept again.
+
+MAGIC = b'ALRPTAB\0'
+VERSION = 2
+HEADER_FORMAT = '<8sHHQQQ'
+HEADER_SIZE = 64
+RECORD_SIZE = 12
+DEFAULT_SHARD_SIZE = 10**7
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'period_cache')
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([
+        ('order', '<u8'),
+        ('preperiod', 'u1'),
+        ('v2', 'u1'),
+        ('v5', 'u1'),
+        ('pad', 'u1'),
+    ])
+
+def shard_path(directory, lo):
+    """File name of the shard starting at n = lo"""
+    return os.path.join(directory, f"periods_{lo:013d}.ptab")
+
+def write_shard(directory, lo, order, preperiod, v2, v5, shard_size=None):
+    """Write one shard for n = lo .. lo+len(order)-1 (atomic rename into place)"""
+    if np is None:
+        raise ImportError("period_store needs numpy")
+
+    hi = lo + len(order)
+    records = np.zeros(hi - lo, dtype=RECORD_DTYPE)
+    records['order'] = order
+    records['preperiod'] = preperiod
+    records['v2'] = v2
+    records['v5'] = v5
+
+    os.makedirs(directory, exist_ok=True)
+    path = shard_path(directory, lo)
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_SIZE,
+                         lo, hi, shard_size or hi - lo)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        records.tofile(f)
+    os.replace(path + '.tmp', path)
+    return path
+
+def read_header(path):
+    """Header of a shard file as a dict"""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    magic, version, record_size, lo, hi, shard_size = struct.unpack_from(HEADER_FORMAT, raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a period store shard")
+    if version != VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f"{path}: unsupported version {version} / record size {record_size}")
+    return {'path': path, 'lo': lo, 'hi': hi, 'shard_size': shard_size}
+
+def shard_version(path):
+    """Format version a shard file was written with"""
+    with open(path, 'rb') as f:
+        return struct.unpack_from(HEADER_FORMAT, f.read(HEADER_SIZE))[1]
+
+def open_shard(path):
+    """(header, records) with records a read-only memmap - nothing is copied"""
+    header = read_header(path)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE,
+                        shape=(header['hi'] - header['lo'],))
+    return header, records
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class PeriodStore:
+    """
+    Read access to a directory of shards, same lookups as PeriodTable
+    Shards are memory-mapped on first use; column accessors return views.
+    A pickled store carries only its headers and maps the shards afresh.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        if np is None:
+            raise ImportError("period_store needs numpy")
+        self.directory = directory
+        self._scan()
+
+    def _scan(self):
+        self.headers = sorted((read_header(path) for path in
+                               glob.glob(os.path.join(self.directory, 'periods_*.ptab'))
+                               if shard_version(path) >= VERSION),
+                              key=lambda h: h['lo'])
+        self._starts = [h['lo'] for h in self.headers]
+        self._records = {}
+
+    def __getstate__(self):
+        return dict(self.__dict__, _records={})
+
+    @property
+    def limit(self):
+        """Largest n covered contiguously from 0 (-1 if the store is empty)"""
+        end = 0
+        for h in self.headers:  # shards may overlap while a merge is under way
+            if h['lo'] > end:
+                break
+            end = max(end, h['hi'])
+        return end - 1
+
+    def records(self, index):
+        """Memory-mapped records of shard number index"""
+        if index not in self._records:
+            _, self._records[index] = open_shard(self.headers[index]['path'])
+        return self._records[index]
+
+    def _locate(self, n):
+        index = bisect.bisect_right(self._starts, n) - 1
+        if index < 0 or n >= self.headers[index]['hi']:
+            raise IndexError(f"n = {n} is not in the period store")
+        return index, n - self.headers[index]['lo']
+
+    def column(self, name, index=0):
+        """Zero-copy view of one field ('order', 'preperiod', 'v2', 'v5') of a shard"""
+        return self.records(index)[name]
+
+    def lookup(self, n):
+        """(period_start, period_length) for 1/n, same as PeriodTable.lookup"""
+        index, offset = self._locate(n)
+        record = self.records(index)[offset]
+        order = int(record['order'])
+        return (int(record['preperiod']) if order else 0), order
+
+    def period(self, n):
+        """Period length of 1/n"""
+        return self.lookup(n)[1]
+
+    def orders(self, ns):
+        """
+        Period lengths (uint64) for an array of n, all in the store
+        Shards written since the store was opened are picked up on the
+        first lookup that needs them (a sweep reads back its own pieces).
+        """
+        try:
+            return self._orders(ns)
+        except IndexError:
+            self._scan()
+            return self._orders(ns)
+
+    def _orders(self, ns):
+        ns = np.asarray(ns, dtype=np.int64)
+        out = np.empty(len(ns), dtype=np.uint64)
+        index = np.searchsorted(self._starts, ns, side='right') - 1
+        by_shard = np.argsort(index, kind='stable')
+        for sel in np.split(by_shard, np.flatnonzero(np.diff(index[by_shard])) + 1):
+            if not sel.size:
+                continue
+            i = int(index[sel[0]])
+            offset = ns[sel] - self.headers[i]['lo']
+            if i < 0 or offset.max() >= len(self.records(i)):
+                raise IndexError("n is not in the period store")
+            out[sel] = self.records(i)['order'][offset]
+        return out
+
+    def with_period(self, target_period, lo=2, hi=None):
+        """All n in [lo, hi] whose period length is target_period"""
+        hi = self.limit if hi is None else hi
+        found = []
+        for index, h in enumerate(self.headers):
+            a = max(lo, h['lo'])
+            b = min(hi + 1, h['hi'])
+            if a >= b:
+                continue
+            order = self.column('order', index)[a - h['lo']:b - h['lo']]
+            found.extend((np.flatnonzero(order == target_period) + a).tolist())
+        return found
+
+def save_period_table(table, directory=DEFAULT_DIRECTORY, shard_size=DEFAULT_SHARD_SIZE):
+    """Write a PeriodTable out as shards of shard_size records"""
+    paths = []
+    for lo in range(0, table.limit + 1, shard_size):
+        hi = min(lo + shard_size, table.limit + 1)
+        paths.append(write_shard(directory, lo, table.order[lo:hi], table.preperiod[lo:hi],
+                                 table.v2[lo:hi], table.v5[lo:hi], shard_size))
+    return paths
+
+def load_or_build_period_table(limit, directory=DEFAULT_DIRECTORY, shard_size=DEFAULT_SHARD_SIZE,
+                               workers=None, progress=None):
+    """
+    Period table covering n <= limit, read from the store when it is big enough
+    Otherwise the missing n are swept (over a process pool when workers,
+    by default the core count, is above one and the sweep is large enough)
+    and saved shard by shard, so an interrupted sweep resumes on the next
+    call and a larger limit only adds the tail. progress(done, total)
+    follows the sweep. Without numpy the table is simply built in memory.
+    """
+    if np is None:
+        return build_period_table(limit)
+
+    if os.path.isdir(directory):
+        store = PeriodStore(directory)
+        if store.limit >= limit:
+            return store
+
+    from sweep import sweep_period_store  # the sweep engine builds on this module
+    return sweep_period_store(limit, directory, shard_size, workers, progress)
+
+# ============================================================================
+# MULTI-TARGET SEARCH
+# ============================================================================
+
+SEARCH_BLOCK = 1 << 20
+
+def search_periods(targets, max_n, lo=2, on_match=None, directory=DEFAULT_DIRECTORY,
+                   shard_size=DEFAULT_SHARD_SIZE, workers=None, progress=None):
+    """
+    Every n in [lo, max_n] whose period length is wanted, in one pass
+    targets is a collection of period lengths or a predicate on a period
+    length (asked once per distinct length; 0 stands for terminating
+    1/n). Returns {period: [n, ...]}: one list per target, or one per
+    accepted length for a predicate. on_match(n, period) is called as
+    matches turn up - first from the stored shards, then from each piece
+    the sweep adds, the moment it is done.
+    """
+    predicate = targets if callable(targets) else None
+    found = {} if predicate else {target: [] for target in sorted(set(targets))}
+    verdicts = {}
+
+    def accept(period):
+        if predicate is None:
+            return period in found
+        if period not in verdicts:
+            verdicts[period] = bool(predicate(period))
+        return verdicts[period]
+
+    def scan(start, order, seen_to=0):
+        """Matches among n = start + i, order[i] the period of n (n < seen_to already scanned)"""
+        a = max(lo - start, seen_to - start, 0)
+        b = min(max_n + 1 - start, len(order))
+        if np is None:
+            hits = [(start + i, order[i]) for i in range(a, b) if accept(order[i])]
+        else:
+            hits = []
+            for block in range(a, b, SEARCH_BLOCK):
+                block_order = order[block:min(block + SEARCH_BLOCK, b)]
+                accepted = [period for period in np.unique(block_order).tolist() if accept(period)]
+                if accepted:
+                    index = np.flatnonzero(np.isin(block_order, accepted))
+                    hits.extend(zip((index + start + block).tolist(), block_order[index].tolist()))
+        for n, period in hits:
+            found.setdefault(period, []).append(n)
+            if on_match:
+                on_match(n, period)
+
+    if np is None:
+        scan(0, build_period_table(max_n).order)
+    else:
+        store = PeriodStore(directory) if os.path.isdir(directory) else None
+        scanned = {}    # lo -> hi of the stored shards (a short one may be swept again)
+        if store is not None:
+            for index, h in enumerate(store.headers):
+                scan(h['lo'], store.column('order', index))
+                scanned[h['lo']] = h['hi']
+        if store is None or store.limit < max_n:
+            from sweep import sweep_period_store
+            sweep_period_store(max_n, directory, shard_size, workers, progress,
+                               on_piece=lambda start, records: scan(start, records['order'],
+                                                                    scanned.get(start, 0)))
+
+    for numbers in found.values():
+        numbers.sort()
+    return dict(sorted(found.items()))
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    import tempfile
+    import time
+
+    print("=" * 80)
+    print("PERSISTENT PERIOD STORE")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start_time = time.time()
+        load_or_build_period_table(10**6, directory, shard_size=250000)
+        print(f"Built and saved table to 10^6: {time.time() - start_time:.2f}s")
+
+        start_time = time.time()
+        store = load_or_build_period_table(10**6, directory)
+        print(f"Reopened {len(store.headers)} shards: {time.time() - start_time:.4f}s")
+
+        for n in [137, 92, 173, 34259, 137036, 999983]:
+            start, length = store.lookup(n)
+            print(f"1/{n}: period {length}, starts at position {start}")
+        table = build_period_table(10**4)
+        agree = all(store.lookup(n) == table.lookup(n) for n in range(1, 10**4))
+        print(f"lookup agrees with PeriodTable for n < 10^4 (terminating too): {'YES' if agree else 'NO'}")
+        print(f"Period 43 up to 10^6: {len(store.with_period(43))} numbers")
+
+        streamed = []
+        start_time = time.time()
+        found = search_periods({0, 8, 22, 43}, 2 * 10**6, directory=directory,
+                               on_match=lambda n, period: streamed.append(n))
+        store = PeriodStore(directory)
+        agree = all(found[period] == store.with_period(period, hi=2 * 10**6) for period in found)
+        print(f"Periods 0 (terminating), 8, 22, 43 up to 2*10^6 in one pass "
+              f"(short last shard and tail swept on the way): "
+              f"{time.time() - start_time:.2f}s, {len(streamed)} matches streamed, "
+              f"agree with with_period: {'YES' if agree else 'NO'}")
+        found = search_periods(lambda period: 0 < period < 6, 10**6, directory=directory)
+        print(f"Periods below 6 up to 10^6: " +
+              ", ".join(f"{period}: {len(numbers)}" for period, numbers in found.items()))
+
+if __name__ == "__main__":
+    main()
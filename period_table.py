@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Period Table - Decimal Periods for Every n up to N
+Smallest-prime-factor sieve: ord_p(10) once per prime, lifted to prime
+powers and combined by lcm, plus the pre-period from the 2/5 valuations
+"""
+
+import math
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - fall back to plain lists
+    np = None
+
+# ============================================================================
+# SIEVE
+# ============================================================================
+
+def smallest_prime_factors(limit):
+    """spf[m] = smallest prime factor of m for 2 <= m <= limit (spf[0], spf[1] = 0, 1)"""
+    if np is not None:
+        spf = np.zeros(limit + 1, dtype=np.uint32)
+        for p in range(2, math.isqrt(limit) + 1):
+            if spf[p] == 0:
+                block = spf[p * p::p]
+                block[block == 0] = p
+        unmarked = np.flatnonzero(spf == 0)
+        spf[unmarked] = unmarked  # primes are their own smallest factor
+        return spf
+
+    spf = list(range(limit + 1))
+    for p in range(2, math.isqrt(limit) + 1):
+        if spf[p] == p:
+            for m in range(p * p, limit + 1, p):
+                if spf[m] == m:
+                    spf[m] = p
+    return spf
+
+def order_mod_prime(p, spf, base=10):
+    """ord_p(base) for a prime p not dividing base, factoring p-1 through the sieve"""
+    order = p - 1
+    m = order
+    while m > 1:
+        q = int(spf[m])
+        while m % q == 0:
+            m //= q
+        while order % q == 0 and pow(base, order // q, p) == 1:
+            order //= q
+    return order
+
+# Moduli below this multiply in uint64 directly; up to MULMOD_LIMIT through
+# a float quotient estimate
+DIRECT_MULMOD_LIMIT = 2**32
+MULMOD_LIMIT = 2**50
+
+def _mulmod(a, b, moduli):
+    """
+    Elementwise a * b mod m for uint64 arrays with a, b < m < MULMOD_LIMIT
+    The quotient from float64 is off by at most one, and a*b - q*m is
+    exact modulo 2^64, so one correction either way finishes it.
+    """
+    q = np.floor(a.astype(np.float64) * b.astype(np.float64) / moduli.astype(np.float64))
+    r = (a * b - q.astype(np.uint64) * moduli).view(np.int64)
+    m = moduli.view(np.int64)
+    r = np.where(r < 0, r + m, r)
+    r = np.where(r >= m, r - m, r)
+    return r.view(np.uint64)
+
+def _powmod_array(base, exponents, moduli):
+    """Elementwise base^e mod m for uint64 arrays with m < MULMOD_LIMIT"""
+    if moduli.size and int(moduli.max()) >= DIRECT_MULMOD_LIMIT:
+        mulmod = _mulmod
+    else:
+        mulmod = lambda a, b, m: a * b % m
+    result = np.ones_like(moduli)
+    b = np.full_like(moduli, base) % moduli
+    e = exponents.copy()
+    while True:
+        odd = (e & 1).astype(bool)
+        result = np.where(odd, mulmod(result, b, moduli), result)
+        e >>= 1
+        if not e.any():
+            return result
+        b = mulmod(b, b, moduli)
+
+def orders_mod_primes(primes, spf, base=10):
+    """Vectorized ord_p(base) for an array of primes below 2^50 (numpy only)"""
+    p = primes.astype(np.uint64)
+    order = p - 1
+    m = order.copy()
+    while True:
+        active = np.flatnonzero(m > 1)
+        if not active.size:
+            return order
+        q = spf[m[active]].astype(np.uint64)
+
+        # Remove q from what is left to factor
+        rest = m[active]
+        while True:
+            divisible = rest % q == 0
+            if not divisible.any():
+                break
+            rest[divisible] //= q[divisible]
+        m[active] = rest
+
+        # Remove q from the order while base^(order/q) is still 1
+        sel = active
+        while sel.size:
+            cand = order[sel] // q
+            ok = (order[sel] % q == 0) & (_powmod_array(base, cand, p[sel]) == 1)
+            order[sel[ok]] = cand[ok]
+            sel = sel[ok]
+            q = q[ok]
+
+def prime_power_orders(p, limit, spf, base=10):
+    """[(p^k, ord_{p^k}(base)), ...] for every power of p up to limit"""
+    order = order_mod_prime(p, spf, base)
+    result = [(p, order)]
+    q = p * p
+    while q <= limit:
+        # ord(p^k) is either ord(p^(k-1)) or p * ord(p^(k-1)) for odd p
+        if pow(base, order, q) != 1:
+            order *= p
+        result.append((q, order))
+        q *= p
+    return result
+
+# ============================================================================
+# TABLE
+# ============================================================================
+
+class PeriodTable:
+    """
+    Decimal period data for 1/n, indexed directly by n (0 <= n <= limit)
+    order[n]     - period length ord(10) of the part of n coprime to 10
+                   (0 when 1/n terminates)
+    preperiod[n] - position where the period starts = max(v2, v5)
+                   (the number of digits when 1/n terminates)
+    v2[n], v5[n] - 2-adic and 5-adic valuations of n
+    """
+
+    def __init__(self, order, preperiod, v2, v5):
+        self.order = order
+        self.preperiod = preperiod
+        self.v2 = v2
+        self.v5 = v5
+
+    @property
+    def limit(self):
+        return len(self.order) - 1
+
+    def lookup(self, n):
+        """(period_start, period_length) for 1/n, same as find_period_length_bounded"""
+        order = int(self.order[n])
+        return (int(self.preperiod[n]) if order else 0), order
+
+    def period(self, n):
+        """Period length of 1/n"""
+        return int(self.order[n])
+
+    def with_period(self, target_period, lo=2, hi=None):
+        """All n in [lo, hi] (hi defaults to limit) whose period length is target_period"""
+        hi = self.limit if hi is None else min(hi, self.limit)
+        if np is not None and isinstance(self.order, np.ndarray):
+            found = np.flatnonzero(self.order[lo:hi + 1] == target_period) + lo
+            return found.tolist()
+        return [n for n in range(lo, hi + 1) if self.order[n] == target_period]
+
+def _valuations(limit, p):
+    """v_p(n) for every n in 0..limit"""
+    if np is not None:
+        v = np.zeros(limit + 1, dtype=np.uint8)
+        q = p
+        while q <= limit:
+            v[q::q] += 1
+            q *= p
+        return v
+
+    v = [0] * (limit + 1)
+    q = p
+    while q <= limit:
+        for m in range(q, limit + 1, q):
+            v[m] += 1
+        q *= p
+    return v
+
+def build_period_table(limit, verbose=False):
+    """Build the PeriodTable for every n <= limit in one sieve pass"""
+    start_time = time.time()
+    limit = max(limit, 1)
+    spf = smallest_prime_factors(limit)
+    if verbose:
+        print(f"  Sieve to {limit}: {time.time() - start_time:.2f}s")
+
+    v2 = _valuations(limit, 2)
+    v5 = _valuations(limit, 5)
+
+    if np is not None:
+        dtype = np.uint32 if limit < 2**32 else np.uint64
+        order = np.ones(limit + 1, dtype=dtype)
+        primes = np.flatnonzero(spf == np.arange(limit + 1, dtype=spf.dtype))
+        primes = primes[(primes > 1) & (primes != 2) & (primes != 5)]
+
+        root = math.isqrt(limit)
+        small = primes[primes <= root]
+        large = primes[primes > root]
+
+        # Small primes: powers exist, one slice per prime power.
+        # ord(p^k) | ord(p^(k+1)), so applying powers in turn leaves the top one.
+        for p in small.tolist():
+            for q, o in prime_power_orders(p, limit, spf):
+                view = order[q::q]
+                view[:] = np.lcm(view, o)
+
+        # Large primes appear to the first power only: sweep multiples j*p
+        # for all primes at once (indices j*p are distinct for fixed j)
+        if limit < 2**32:
+            large_orders = orders_mod_primes(large, spf).astype(dtype)
+        else:
+            large_orders = np.array([order_mod_prime(p, spf) for p in large.tolist()], dtype=dtype)
+        j = 1
+        while len(large):
+            keep = large * j <= limit
+            large = large[keep]
+            large_orders = large_orders[keep]
+            idx = large * j
+            order[idx] = np.lcm(order[idx], large_orders)
+            j += 1
+
+        preperiod = np.maximum(v2, v5)
+        unit = (np.uint64(2) ** v2.astype(np.uint64)) * (np.uint64(5) ** v5.astype(np.uint64))
+        terminating = np.arange(limit + 1, dtype=np.uint64) == unit
+        terminating[:2] = True
+        order[terminating] = 0
+    else:
+        order = [1] * (limit + 1)
+        for p in range(3, limit + 1):
+            if spf[p] != p or p == 5:
+                continue
+            for q, o in prime_power_orders(p, limit, spf):
+                for m in range(q, limit + 1, q):
+                    order[m] = math.lcm(order[m], o)
+
+        preperiod = [max(a, b) for a, b in zip(v2, v5)]
+        for n in range(limit + 1):
+            if n < 2 or n == 2 ** v2[n] * 5 ** v5[n]:
+                order[n] = 0
+
+    if verbose:
+        print(f"  Period table to {limit}: {time.time() - start_time:.2f}s")
+    return PeriodTable(order, preperiod, v2, v5)
+
+# ============================================================================
+# LOCKSTEP REMAINDER ENGINE
+# ============================================================================
+
+def lockstep_periods(ns, max_length=None):
+    """
+    (period_start, period_length) uint32 arrays for an array of n < 2^31
+    Runs r <- 10 r mod n for the whole array at once: every r starts at
+    10^start mod n (start from the 2/5 valuations, so it is on the cycle)
+    and the period is the first step at which it comes back. Finished
+    moduli drop out of the working arrays. Same results as
+    find_period_length_bounded, including (0, 0) for terminating 1/n and for
+    periods not found within max_length digits.
+    """
+    if np is None:
+        raise ImportError("lockstep_periods needs numpy")
+
+    n = np.asarray(ns, dtype=np.int64)
+    if n.size and (n.min() < 1 or n.max() >= 2**31):
+        raise ValueError("lockstep_periods needs 1 <= n < 2^31")
+
+    core = n.copy()
+    v2 = np.zeros(n.shape, dtype=np.int64)
+    v5 = np.zeros(n.shape, dtype=np.int64)
+    for p, v in ((2, v2), (5, v5)):
+        while True:
+            divisible = core % p == 0
+            if not divisible.any():
+                break
+            core[divisible] //= p
+            v[divisible] += 1
+    start = np.maximum(v2, v5)
+    length = np.zeros(n.shape, dtype=np.uint32)
+
+    first = np.ones(n.shape, dtype=np.int64) % n
+    for step in range(int(start.max(initial=0))):
+        first = np.where(step < start, first * 10 % n, first)
+
+    # Lockstep walk over the moduli that still have a period to find
+    active = np.flatnonzero(core > 1)
+    act_n = n[active]
+    act_first = first[active]
+    act_start = start[active]
+    r = act_first * 10 % act_n
+    steps = 1
+    while active.size:
+        done = r == act_first
+        if max_length is not None:
+            give_up = ~done & (act_start + steps >= max_length)
+            done_within = done & (act_start + steps < max_length)
+            length[active[done_within]] = steps
+            done |= give_up
+        else:
+            length[active[done]] = steps
+        if done.any():
+            keep = ~done
+            active = active[keep]
+            act_n = act_n[keep]
+            act_first = act_first[keep]
+            act_start = act_start[keep]
+            r = r[keep]
+        r = r * 10 % act_n
+        steps += 1
+
+    start[length == 0] = 0
+    return start.astype(np.uint32), length
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    print("=" * 80)
+    print("PERIOD TABLE BUILDER")
+    print("=" * 80)
+
+    from periods import find_period_length_bounded
+
+    table = build_period_table(10**6, verbose=True)
+    for n in [137, 92, 173, 34259, 137036]:
+        start, length = table.lookup(n)
+        print(f"1/{n}: period {length}, starts at position {start}")
+    agree = all(table.lookup(n) == find_period_length_bounded(n) for n in range(1, 10**4))
+    print(f"lookup agrees with find_period_length_bounded for n < 10^4 (terminating too): "
+          f"{'YES' if agree else 'NO'}")
+
+    for target in [8, 22, 43]:
+        found = table.with_period(target)
+        print(f"\nPeriod {target}: {len(found)} numbers up to {table.limit}")
+        print(f"  {found[:20]}{' ...' if len(found) > 20 else ''}")
+
+    if np is not None:
+        ns = np.arange(2, 10**5)
+        start_time = time.time()
+        starts, lengths = lockstep_periods(ns)
+        periodic = lengths > 0
+        agree = ((lengths == table.order[2:10**5]).all()
+                 and (starts[periodic] == table.preperiod[2:10**5][periodic]).all())
+        print(f"\nLockstep engine, n < 10^5: {time.time() - start_time:.2f}s, "
+              f"matches table: {'YES' if agree else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Decimal Periods of 1/n - Closed Form
+Pre-period and period length from the order engine, repetend digits in
+one exact big-number step instead of digit-by-digit long division, a
+shared digit buffer, random access to any digit, an implicit period
+integer for modular work, and the inverse query: every n with a given
+period, from 10^k - 1
+"""
+
+import math
+import sys
+from decimal import MAX_EMAX, ROUND_FLOOR, Decimal, Inexact, localcontext
+from functools import cached_property
+
+from cyclotomic_table import factor_power_minus_one
+from number_theory import multiplicative_order
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - only Period.digits needs it
+    np = None
+
+# Periods run to millions of digits - lift the int <-> str digit cap (3.11+)
+if hasattr(sys, "set_int_max_str_digits"):
+    sys.set_int_max_str_digits(0)
+
+# ============================================================================
+# PERIOD STRUCTURE
+# ============================================================================
+
+def valuation(n, p):
+    """Exponent of the prime p in n"""
+    count = 0
+    while n % p == 0:
+        n //= p
+        count += 1
+    return count
+
+def period_info(n):
+    """
+    (period_start, period_length) for 1/n
+    The period starts after max(v2(n), v5(n)) digits and has length
+    ord_m(10), m being n with its factors of 2 and 5 removed
+    (0 if 1/n terminates).
+    """
+    start = max(valuation(n, 2), valuation(n, 5))
+    return start, multiplicative_order(10, n)
+
+def find_period_length_bounded(n, max_length=None, method='brent'):
+    """
+    (period_start, period_length) for 1/n in O(1) memory - no remainder dict
+    The start comes straight from the 2- and 5-adic valuations, so the
+    remainder 10^start mod n is already on the cycle. method='brent' walks
+    r -> 10r mod n with Brent's cycle detection (O(period) steps);
+    method='order' checks candidate
+    orders through the factorization engine instead.
+    Returns (0, 0) when 1/n terminates or when the period would not be
+    found within max_length digits, as the old remainder-dictionary walk did.
+    """
+    start = max(valuation(n, 2), valuation(n, 5))
+    m = n // (2 ** valuation(n, 2) * 5 ** valuation(n, 5))
+    if m == 1:
+        return 0, 0
+
+    if method == 'order':
+        return start, multiplicative_order(10, m)
+    if method != 'brent':
+        raise ValueError(f"Unknown method: {method}")
+
+    # Brent: the tortoise waits at powers of two while the hare runs ahead.
+    # A phase that ends without a meeting proves length > power.
+    tortoise = pow(10, start, n)
+    hare = tortoise * 10 % n
+    power = length = 1
+    while tortoise != hare:
+        if power == length:
+            if max_length is not None and power >= max_length:
+                return 0, 0
+            tortoise = hare
+            power *= 2
+            length = 0
+        hare = hare * 10 % n
+        length += 1
+
+    if max_length is not None and start + length >= max_length:
+        return 0, 0
+    return start, length
+
+# ============================================================================
+# DIGIT EXTRACTION
+# ============================================================================
+
+def get_period_digits(n):
+    """
+    Extract the repeating period digits from 1/n - any length, no truncation
+    Returns (period_start, period). If 1/n terminates, period holds the
+    terminating digits instead, as the long-division version did.
+
+    With s = period_start and L = period length, 10^s / n = A + r/n, and
+    the repetend is the L-digit integer (10^L - 1) * r / n. It is computed
+    in decimal arithmetic so the digits come out without a binary-to-
+    decimal conversion; Inexact is trapped, so any rounding would raise.
+    """
+    start, length = period_info(n)
+
+    if length == 0:
+        return 0, str(10**start // n).zfill(start) if start else ''
+
+    r = pow(10, start, n)
+    with localcontext() as ctx:
+        ctx.prec = length + len(str(n)) + 2
+        ctx.Emax = MAX_EMAX
+        ctx.traps[Inexact] = True
+        repetend = (Decimal(10) ** length - 1) * r / n
+
+    return start, format(repetend, 'f').zfill(length)
+
+# ============================================================================
+# RANDOM-ACCESS DIGITS
+# ============================================================================
+
+DIGIT_BLOCK = 256  # digits produced per long-division step
+
+def digit(n, k):
+    """Digit of 1/n at place k after the decimal point (k = 0 is the first)"""
+    return 10 * pow(10, k, n) // n
+
+def iter_digits(n, k, count, block=DIGIT_BLOCK):
+    """
+    count digits of 1/n starting at place k, as str blocks of up to block digits
+    The long-division remainder in front of place k is 10^k mod n, so the
+    seek is one modular power (O(log k)) however far out k lies; the
+    digits then come from block long division in constant memory.
+    """
+    r = pow(10, k, n)
+    power = 10**block
+    while count > 0:
+        if count < block:
+            block, power = count, 10**count
+        quotient, r = divmod(r * power, n)
+        yield str(quotient).zfill(block)
+        count -= block
+
+def digits(n, k, count):
+    """count digits of 1/n starting at place k, without the digits before it"""
+    return ''.join(iter_digits(n, k, count))
+
+# ============================================================================
+# SHARED DIGIT BUFFER
+# ============================================================================
+
+class Period:
+    """
+    The period digits of 1/n, held once as a contiguous ASCII byte buffer
+    Slices come out as zero-copy memoryviews (view), and the str, int and
+    numpy forms are built on first use and cached, so the analyses of one
+    period all read the same buffer instead of re-parsing their own str
+    or list of ints. Like get_period_digits, a terminating 1/n holds its
+    terminating digits.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.start, digits = get_period_digits(n)
+        self.buffer = digits.encode('ascii')
+
+    def __repr__(self):
+        return f"Period(n={self.n}, start={self.start}, length={len(self.buffer)})"
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __str__(self):
+        return self.text
+
+    def __getitem__(self, index):
+        """Digit value at an index, or the str of a slice (only the slice is copied)"""
+        if isinstance(index, slice):
+            return str(self.view()[index], 'ascii')
+        return self.buffer[index] - 48
+
+    def __contains__(self, pattern):
+        """Whether a digit string (or number) occurs in the period"""
+        return str(pattern).encode('ascii') in self.buffer
+
+    def view(self, start=0, stop=None):
+        """Zero-copy memoryview of the ASCII digits in [start, stop)"""
+        return memoryview(self.buffer)[start:stop]
+
+    @cached_property
+    def text(self):
+        """The period as a str"""
+        return self.buffer.decode('ascii')
+
+    @cached_property
+    def value(self):
+        """The period as an integer (0 if empty)"""
+        return int(self.buffer) if self.buffer else 0
+
+    @cached_property
+    def digits(self):
+        """uint8 numpy array of digit values 0-9"""
+        if np is None:
+            raise ImportError("Period.digits needs numpy")
+        return np.frombuffer(self.buffer, dtype=np.uint8) - 48
+
+    @cached_property
+    def counts(self):
+        """Occurrences of each digit 0-9"""
+        return [self.buffer.count(48 + d) for d in range(10)]
+
+    @property
+    def digit_sum(self):
+        """Sum of the period digits"""
+        return sum(d * count for d, count in enumerate(self.counts))
+
+    @cached_property
+    def repetend(self):
+        """The implicit period integer, for modular work without value"""
+        return Repetend(self.n)
+
+# ============================================================================
+# IMPLICIT PERIOD INTEGER
+# ============================================================================
+
+# Below this many digits bit_length just builds the integer
+EXACT_BIT_LENGTH_DIGITS = 10**4
+
+class Repetend:
+    """
+    The period integer P of 1/n, never built: P = (10^L - 1) * r / n
+    with L the period length and r = 10^start mod n (for terminating 1/n,
+    P = 10^start / n - the terminating digits, as in get_period_digits).
+    Since n divides the numerator N exactly, N mod (n*m) = n * (P mod m),
+    so P mod m costs one pow(10, L, n*m) whatever the size of L.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.start, self.length = period_info(n)
+        self.r = pow(10, self.start, n)
+
+    def __repr__(self):
+        return f"Repetend(n={self.n}, start={self.start}, length={self.length})"
+
+    def _numerator_mod(self, modulus):
+        if self.length == 0:
+            return pow(10, self.start, modulus)
+        return (pow(10, self.length, modulus) - 1) * self.r % modulus
+
+    def __mod__(self, m):
+        """P mod m"""
+        return self._numerator_mod(self.n * m) // self.n
+
+    def digits(self, k, count):
+        """count digits of P from position k, wrapping around the period end"""
+        place = self.start + k % self.length if self.length else k
+        return digits(self.n, place, count)
+
+    def divisible_by(self, m):
+        """Whether m divides P"""
+        return self % m == 0
+
+    def digit_sum_mod_9(self):
+        """Decimal digit sum of P mod 9 (equal to P mod 9)"""
+        return self % 9
+
+    def bit_length(self):
+        """
+        Bit length of P, from log2 P = L log2 10 + log2(r/n)
+        P is the floor of 10^L r / n (as r < n), so its bit length is
+        floor(log2(10^L r / n)) + 1. The float sum is good to a few ulps of
+        itself; when it lands that close to an integer, the log is redone
+        in Decimal.
+        """
+        if self.length <= EXACT_BIT_LENGTH_DIGITS:
+            return int(self).bit_length()
+        log = self.length * math.log2(10) + math.log2(self.r) - math.log2(self.n)
+        if abs(log - round(log)) > log * 2**-48:
+            return math.floor(log) + 1
+        return self._precise_bit_length()
+
+    def _precise_bit_length(self):
+        """
+        bit_length from log2(10^L r / n) in Decimal, at growing precision
+        That log is never an integer (10^L r = n 2^m would need n | r), so
+        raising the precision always separates it from the nearest one.
+        """
+        precision = len(str(self.length)) + 20
+        while True:
+            with localcontext() as ctx:
+                ctx.prec = precision
+                ctx.traps[Inexact] = False
+                log = ((self.length * Decimal(10).ln() + Decimal(self.r).ln()
+                        - Decimal(self.n).ln()) / Decimal(2).ln())
+                if abs(log - log.to_integral_value()) > log.scaleb(2 - precision):
+                    return int(log.to_integral_value(rounding=ROUND_FLOOR)) + 1
+            precision *= 2
+
+    def __int__(self):
+        """Build P itself (the expensive path)"""
+        if self.length == 0:
+            return 10**self.start // self.n
+        return (10**self.length - 1) * self.r // self.n
+
+# ============================================================================
+# INVERSE QUERY: ALL n WITH A GIVEN PERIOD
+# ============================================================================
+
+def numbers_with_period(period_length, max_preperiod=0, max_n=None, max_time=None):
+    """
+    Every n whose 1/n has exactly the given period length - no scanning
+    For n coprime to 10, period k means n | 10^k - 1 with ord_n(10) = k,
+    so that population is finite: the divisors of 10^k - 1 of exact
+    order k. Each is multiplied by 2^a * 5^b with a, b <= max_preperiod
+    (giving pre-period max(a, b)). Returns a sorted list, capped at max_n
+    (divisors past it are dropped as the products are built), or None if
+    10^k - 1 cannot be factored within max_time seconds.
+    The factorization comes from the cyclotomic table, so it is only
+    ever computed once per k.
+    """
+    k = period_length
+    combos = [(1, 1)]  # (divisor, its order) - ord_1 taken as 1 for the lcm
+    if k > 0:
+        factors = factor_power_minus_one(k, max_time)
+        if factors is None:
+            return None
+        for p, e in factors.items():
+            # ord(p^i) is ord(p^(i-1)) or p * ord(p^(i-1)) for odd p
+            powers = [(1, 1)]
+            q = p
+            order = multiplicative_order(10, p)
+            for _ in range(e):
+                if max_n is not None and q > max_n:
+                    break
+                if pow(10, order, q) != 1:
+                    order *= p
+                powers.append((q, order))
+                q *= p
+            combos = [(d * q, math.lcm(o, oq)) for d, o in combos for q, oq in powers
+                      if max_n is None or d * q <= max_n]
+        coprime = [d for d, o in combos if o == k and d > 1]
+    else:
+        coprime = [1]
+
+    multipliers = [2**a * 5**b for a in range(max_preperiod + 1) for b in range(max_preperiod + 1)]
+    results = [d * m for d in coprime for m in multipliers if max_n is None or d * m <= max_n]
+    return sorted(n for n in results if n > 1)
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    import time
+
+    print("=" * 80)
+    print("CLOSED-FORM PERIOD EXTRACTION")
+    print("=" * 80)
+
+    for n in [137, 92, 173, 34259]:
+        period = Period(n)
+        print(f"1/{n}: start {period.start}, length {len(period)}, digit sum {period.digit_sum}, "
+              f"period {period[:50]}{'...' if len(period) > 50 else ''}")
+
+    for k in [8, 22]:
+        coprime = numbers_with_period(k)
+        print(f"\nAll {len(coprime)} n coprime to 10 with period {k}:")
+        print(f"  {coprime[:12]}{' ...' if len(coprime) > 12 else ''}")
+
+    from period_table import build_period_table
+    table = build_period_table(10**6)
+    start_time = time.time()
+    found = {k: numbers_with_period(k, max_preperiod=20, max_n=10**6) for k in (22, 60, 96)}
+    agree = all(found[k] == table.with_period(k) for k in found)
+    print(f"Periods 22, 60, 96 up to 10^6 from the divisors (pruned at max_n): "
+          f"{time.time() - start_time:.4f}s, match the table: {'YES' if agree else 'NO'}")
+
+    repetend = Repetend(10**9 + 7)
+    start_time = time.time()
+    residues = [repetend % m for m in (8, 22, 23, 24, 43)]
+    print(f"\n1/{repetend.n}: period {repetend.length}, P mod 8/22/23/24/43 = {residues}, "
+          f"{repetend.bit_length()} bits ({time.time() - start_time:.4f}s)")
+    exact = [n for n in range(10007, 10400) if period_info(n)[1] > EXACT_BIT_LENGTH_DIGITS][:10]
+    agree = all(Repetend(n).bit_length() == Repetend(n)._precise_bit_length() == int(Repetend(n)).bit_length()
+                for n in exact)
+    print(f"Float and Decimal bit lengths agree with the built P for {len(exact)} periods: "
+          f"{'YES' if agree else 'NO'}")
+
+    n = 34259
+    period = Period(n)
+    agree = all(digits(n, period.start + k, 40) == (period.text * 2)[k:k + 40] and
+                digit(n, period.start + k) == period[k] for k in range(0, len(period), 997))
+    agree &= Repetend(n).digits(len(period) - 20, 40) == period[-20:] + period[:20]
+    print(f"\nRandom-access digits of 1/{n} agree with the full period: {'YES' if agree else 'NO'}")
+
+    repetend = Repetend(10**12 + 39)
+    start_time = time.time()
+    sample = repetend.digits(repetend.length // 2, 30)
+    print(f"1/{repetend.n}: period {repetend.length}, 30 digits from the middle {sample} "
+          f"({time.time() - start_time:.4f}s)")
+
+    n = 10**7 + 19
+    start_time = time.time()
+    _, period = get_period_digits(n)
+    print(f"\n1/{n}: {len(period)} digits in {time.time() - start_time:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Remainder Trees - One Huge Integer Modulo Thousands of Moduli
+Product tree over the moduli, a single reduction of the integer by the
+root, then residues pushed down the tree level by level
+"""
+
+# ============================================================================
+# PRODUCT TREE
+# ============================================================================
+
+def product_tree(moduli):
+    """Levels of products, leaves first: tree[0] = moduli, tree[-1] = [product]"""
+    tree = [list(moduli)]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)])
+    return tree
+
+# ============================================================================
+# TOP REDUCTION
+# ============================================================================
+
+# Below this modulus size the builtin long division is quicker
+BARRETT_BITS = 1 << 14
+
+def _reduce(num, modulus):
+    """
+    num mod modulus for a num far larger than the modulus
+    num is consumed in byte-aligned chunks a little narrower than the
+    modulus (sliced once from its bytes, never re-shifted), each step a
+    Barrett reduction (two multiplications) instead of a long division,
+    so the cost grows with multiplication speed rather than size(num) x
+    size(m). Small moduli go to the builtin %.
+    """
+    k = modulus.bit_length()
+    if k < BARRETT_BITS or num.bit_length() <= 2 * k:
+        return num % modulus
+    mu = (1 << (2 * k)) // modulus
+    width = k // 8  # chunk bytes: (r << 8 * width) | chunk stays below 2^(2k)
+    data = num.to_bytes((num.bit_length() + 7) // 8, 'big')
+    first = len(data) % width or width
+    r = int.from_bytes(data[:first], 'big') % modulus
+    for i in range(first, len(data), width):
+        x = (r << (8 * width)) | int.from_bytes(data[i:i + width], 'big')
+        q = ((x >> (k - 1)) * mu) >> (k + 1)
+        r = x - q * modulus
+        while r >= modulus:
+            r -= modulus
+    return r
+
+# ============================================================================
+# REMAINDER TREE
+# ============================================================================
+
+def remainder_tree(num, moduli, tree=None):
+    """
+    [num mod m for m in moduli] from one reduction at the root
+    num may be an int or anything with a % operator (a periods.Repetend
+    reduces modulo the root product through one modular power).
+    """
+    moduli = list(moduli)
+    if not moduli:
+        return []
+    tree = tree or product_tree(moduli)
+    root = tree[-1][0]
+    residues = [_reduce(num, root) if isinstance(num, int) else num % root]
+    for level in reversed(tree[:-1]):
+        residues = [residues[i // 2] % m for i, m in enumerate(level)]
+    return residues
+
+def batch_residues(num, moduli):
+    """{m: num mod m} for every modulus (duplicates computed once)"""
+    unique = sorted(set(moduli))
+    return dict(zip(unique, remainder_tree(num, unique)))
+
+def residue_hits(num, moduli):
+    """
+    Moduli m with num = 0, +1 or -1 (mod m), as (m, residue, kind)
+    kind is 'perfect_divisor', 'one_more_than_multiple' or
+    'one_less_than_multiple', in the order of moduli.
+    """
+    residues = batch_residues(num, moduli)
+    hits = []
+    for m in moduli:
+        r = residues[m]
+        if r == 0:
+            hits.append((m, r, 'perfect_divisor'))
+        elif r == 1:
+            hits.append((m, r, 'one_more_than_multiple'))
+        elif r == m - 1:
+            hits.append((m, r, 'one_less_than_multiple'))
+    return hits
+
+# ============================================================================
+# SELF-CHECK
+# ============================================================================
+
+def main():
+    import random
+    import time
+
+    from periods import Repetend
+
+    print("=" * 80)
+    print("REMAINDER TREE RESIDUES")
+    print("=" * 80)
+
+    rng = random.Random(7)
+    moduli = [rng.randrange(2, 10**6) for _ in range(5000)]
+    num = (10**1000000 - 1) // 999983
+
+    start_time = time.time()
+    naive = [num % m for m in moduli]
+    naive_time = time.time() - start_time
+
+    start_time = time.time()
+    tree = remainder_tree(num, moduli)
+    tree_time = time.time() - start_time
+    print(f"10^6-digit integer mod {len(moduli)} moduli: one by one {naive_time:.2f}s, "
+          f"remainder tree {tree_time:.2f}s, agree: {'YES' if tree == naive else 'NO'}")
+
+    repetend = Repetend(10**9 + 7)
+    start_time = time.time()
+    residues = remainder_tree(repetend, moduli)
+    agree = all(residues[i] == repetend % m for i, m in enumerate(moduli[:200]))
+    print(f"Period of 1/{repetend.n} ({repetend.length} digits) mod {len(moduli)} moduli: "
+          f"{time.time() - start_time:.2f}s, agree: {'YES' if agree else 'NO'}")
+
+if __name__ == "__main__":
+    main()
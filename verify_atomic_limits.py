@@ -5,10 +5,15 @@ UNIVERSAL VERSION: Works on Termux, Linux, macOS, Windows PowerShell - EVERYWHER
 """
 
 import sys
-import time
 import os
 from decimal import Decimal, getcontext
 
+from base_conversion import representation
+from cyclotomic_table import factor_with_table
+from number_theory import factorint
+from period_store import search_periods
+from periods import Period
+
 # Set high precision
 getcontext().prec = 500
 
@@ -84,100 +89,32 @@ progress = UniversalProgress()
 # CORE FUNCTIONS
 # ============================================================================
 
-def find_period_length(n, max_length=500):
-    """Find the length of the repeating period in 1/n"""
-    remainders = {}
-    remainder = 1
-    position = 0
-    
-    while remainder != 0 and position < max_length:
-        if position % 50 == 0:
-            progress.show(f"Finding period for 1/{n}", position, max_length)
-        
-        if remainder in remainders:
-            period_start = remainders[remainder]
-            period_length = position - period_start
-            progress.show(f"Finding period for 1/{n}", max_length, max_length, final=True)
-            return period_start, period_length
-        
-        remainders[remainder] = position
-        remainder = (remainder * 10) % n
-        position += 1
-    
-    progress.done()
-    return 0, 0
-
-def get_period_digits(n, max_digits=500):
-    """Extract the actual repeating period digits from 1/n"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < max_digits:
-        if position % 50 == 0:
-            progress.show(f"Extracting digits for 1/{n}", position, max_digits)
-        
-        if remainder in seen:
-            period_start = seen[remainder]
-            period = ''.join(decimal_digits[period_start:])
-            progress.show(f"Extracting digits for 1/{n}", max_digits, max_digits, final=True)
-            return period_start, period
-        
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    
-    progress.done()
-    return 0, ''.join(decimal_digits)
-
-def to_base(num, base):
-    """Convert number to given base"""
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        digits.append(str(num % base))
-        num //= base
-    return ''.join(reversed(digits))
+def get_period(n):
+    """Extract the actual repeating period digits from 1/n (one shared Period buffer)"""
+    progress.show(f"Extracting digits for 1/{n}", 0, 1)
+    period = Period(n)
+    progress.show(f"Extracting digits for 1/{n}", 1, 1, final=True)
+    return period
 
-def prime_factorization(n, max_time=3.0):
+def prime_factorization(n, max_time=3.0, period_length=None):
     """
     Prime factorization with timeout protection
-    Returns None if number is too large or taking too long
+    Returns None if the number takes longer than max_time to factor
+    (method picked by size: trial division, Pollard rho, ...)
+    For a period integer pass its period length: the primes of
+    10^period_length - 1 then come from the cyclotomic factor table.
     """
     if n <= 1:
         return []
     
-    # Skip factorization for numbers > 10^12 (would take forever)
-    if n > 10**12:
-        return None
-    
-    factors = []
-    d = 2
-    start_time = time.time()
-    checks = 0
-    
-    while d * d <= n:
-        # Check timeout every 10000 iterations
-        checks += 1
-        if checks % 10000 == 0:
-            elapsed = time.time() - start_time
-            if elapsed > max_time:
-                return None  # Timeout - number too hard to factor
-        
-        while n % d == 0:
-            factors.append(d)
-            n //= d
-        d += 1
-    
-    if n > 1:
-        factors.append(n)
+    if period_length:
+        factors = factor_with_table(n, period_length, max_time=max_time)
+    else:
+        factors = factorint(n, max_time=max_time)
+    if factors is None:
+        return None  # Timeout - number too hard to factor
     
-    return factors
+    return [p for p, e in factors.items() for _ in range(e)]
 
 def analyze_number(n, name):
     """Complete analysis of 1/n with universal progress indicators"""
@@ -189,12 +126,12 @@ def analyze_number(n, name):
     
     # Find period
     print(">> Finding decimal period...")
-    period_start, period = get_period_digits(n)
+    period = get_period(n)
     period_length = len(period)
     
     print(f"\nPeriod: {period[:70]}{'...' if len(period) > 70 else ''}")
     print(f"Period length: {period_length}")
-    print(f"Starts at position: {period_start}")
+    print(f"Starts at position: {period.start}")
     
     # Verify
     if period_length > 0:
@@ -203,34 +140,30 @@ def analyze_number(n, name):
         print(f"Verification (10^{period_length} mod {n} = 1): {status}")
     
     # Analyze period as integer
-    if period and period != '0':
-        period_int = int(period)
-        num_digits = len(str(period_int))
+    if period and period.value != 0:
+        period_int = period.value
+        num_digits = len(period.buffer.lstrip(b'0'))
         
         print(f"\n{'='*80}")
         print(f"PERIOD AS INTEGER ({num_digits} digits)")
         print(f"{'='*80}")
         
-        # Prime factorization (with size check)
-        if num_digits <= 12:
-            print("\n>> Computing prime factorization...")
-            factors = prime_factorization(period_int)
-            
-            if factors is None:
-                print("   (Timeout - number too large to factor quickly)")
-            elif factors:
-                factor_str = ' x '.join(map(str, factors[:30]))
-                if len(factors) > 30:
-                    factor_str += f" ... ({len(factors)} factors total)"
-                print(f"   {factor_str}")
-        else:
-            print(f"\n   Skipping factorization (number has {num_digits} digits)")
+        # Prime factorization (with timeout)
+        print("\n>> Computing prime factorization...")
+        factors = prime_factorization(period_int, period_length=period_length)
+        
+        if factors is None:
+            print("   (Timeout - number too large to factor quickly)")
+        elif factors:
+            factor_str = ' x '.join(map(str, factors[:30]))
+            if len(factors) > 30:
+                factor_str += f" ... ({len(factors)} factors total)"
+            print(f"   {factor_str}")
         
         # Digit analysis
         print("\n>> Analyzing digits...")
-        digits = [int(d) for d in period]
-        unique_digits = sorted(set(digits))
-        digit_sum = sum(digits)
+        unique_digits = [d for d, count in enumerate(period.counts) if count]
+        digit_sum = period.digit_sum
         
         print(f"\n   Unique digits: {unique_digits}")
         print(f"   All 10 digits present: {'YES' if len(unique_digits) == 10 else 'NO'}")
@@ -248,37 +181,37 @@ def analyze_number(n, name):
         print("\n>> Converting to other bases...")
         
         print("\n   Binary:")
-        binary = bin(period_int)[2:]
-        print(f"     {binary[:70]}{'...' if len(binary) > 70 else ''}")
-        print(f"     Length: {len(binary)} bits")
-        ones = binary.count('1')
-        zeros = binary.count('0')
+        binary_length, binary = representation(period_int, 2)
+        print(f"     {binary}{'...' if binary_length > 70 else ''}")
+        print(f"     Length: {binary_length} bits")
+        ones = period_int.bit_count()
+        zeros = binary_length - ones
         print(f"     Ones: {ones}, Zeros: {zeros}")
         print(f"     Perfect balance: {'YES' if ones == zeros else 'NO'}")
         
         print("\n   Ternary (base-3):")
-        ternary = to_base(period_int, 3)
-        print(f"     {ternary[:70]}{'...' if len(ternary) > 70 else ''}")
-        print(f"     Length: {len(ternary)} digits")
-        if len(ternary) == 2 * period_length:
+        ternary_length, ternary = representation(period_int, 3)
+        print(f"     {ternary}{'...' if ternary_length > 70 else ''}")
+        print(f"     Length: {ternary_length} digits")
+        if ternary_length == 2 * period_length:
             print(f"     SPECIAL: Length = 2 x period ({period_length})!")
         
         print("\n   Octal (base-8):")
-        octal = oct(period_int)[2:]
-        print(f"     {octal[:70]}{'...' if len(octal) > 70 else ''}")
-        print(f"     Length: {len(octal)} digits")
-        if len(octal) == 24:
+        octal_length, octal = representation(period_int, 8)
+        print(f"     {octal}{'...' if octal_length > 70 else ''}")
+        print(f"     Length: {octal_length} digits")
+        if octal_length == 24:
             print(f"     SPECIAL: Length = 24 (Golay code dimension)!")
         
         print("\n   Hexadecimal:")
-        hexval = hex(period_int)[2:]
-        print(f"     {hexval[:70]}{'...' if len(hexval) > 70 else ''}")
-        print(f"     Length: {len(hexval)} digits")
+        hex_length, hexval = representation(period_int, 16)
+        print(f"     {hexval}{'...' if hex_length > 70 else ''}")
+        print(f"     Length: {hex_length} digits")
         
         # Modulo operations
         print("\n>> Modulo operations:")
         for mod in [8, 22, 23, 24, 43]:
-            result = period_int % mod
+            result = period.repetend % mod
             print(f"     Period mod {mod:2d} = {result}")
 
 def analyze_rational_number(numerator, denominator, name):
@@ -313,29 +246,29 @@ def verify_multiplicative_order(n, expected_order):
     
     return success
 
-def find_all_with_period(target_period, max_n=1000):
-    """Find all numbers up to max_n with the given period length"""
-    print(f"\nSearching for numbers with period {target_period} (up to {max_n})...")
-    results = []
-    
-    for n in range(2, max_n + 1):
-        if n % 50 == 0:
-            progress.show(f"Searching period {target_period}", n, max_n)
-        
-        _, period_length = find_period_length(n)
-        if period_length == target_period:
-            results.append(n)
-    
-    progress.show(f"Searching period {target_period}", max_n, max_n, final=True)
-    
+def find_all_with_periods(target_periods, max_n=1000):
+    """Find all numbers up to max_n with each of the given period lengths, in one pass"""
+    targets = sorted(set(target_periods))
+    listed = ', '.join(str(t) for t in targets)
+    print(f"\nSearching for numbers with periods {listed} (up to {max_n})...")
+    progress.show(f"Loading period table to {max_n}")
+    found = search_periods(
+        targets, max_n,
+        progress=lambda done, total: progress.show(f"Sweeping periods to {max_n}", done, total))
+    progress.show(f"Searching periods {listed}", max_n, max_n, final=True)
+    
+    for target in targets:
+        print_found(target, found[target])
+    return found
+
+def print_found(target_period, results):
+    """Print the numbers found with a period (the first 50 of them)"""
     print(f"\nFound {len(results)} numbers with period {target_period}:")
     if len(results) <= 50:
         print(f"  {results}")
     else:
         print(f"  {results[:50]}")
         print(f"  ... and {len(results) - 50} more")
-    
-    return results
 
 def main():
     """Main verification routine"""
@@ -392,9 +325,7 @@ def main():
     print("FINDING OTHER NUMBERS WITH THESE PERIODS")
     print("=" * 80)
     
-    period_8 = find_all_with_period(8, 500)
-    period_22 = find_all_with_period(22, 500)
-    period_43 = find_all_with_period(43, 500)
+    find_all_with_periods([8, 22, 43], 500)
     
     # Summary
     print("\n" + "=" * 80)
@@ -7,6 +7,10 @@ Addresses Reviewer 8821's critique with clarified terminology
 import sys
 import math
 
+from base_conversion import to_base
+from number_theory import multiplicative_order
+from periods import get_period_digits
+
 print("\n" + "="*80)
 print("ATOMIC STABILITY LIMITS - COMPUTATIONAL VERIFICATION")
 print("Version 2.0 - Post-Peer-Review Corrections")
@@ -35,59 +39,6 @@ print("="*80)
 # CORE FUNCTIONS
 # ============================================================================
 
-def get_period_digits(n, max_digits=500):
-    """Extract the actual repeating period digits from 1/n in base-10"""
-    decimal_digits = []
-    remainder = 1
-    seen = {}
-    position = 0
-    
-    while remainder != 0 and position < max_digits:
-        if remainder in seen:
-            period_start = seen[remainder]
-            period = ''.join(decimal_digits[period_start:])
-            return period_start, period
-        
-        seen[remainder] = position
-        remainder *= 10
-        digit = remainder // n
-        decimal_digits.append(str(digit))
-        remainder = remainder % n
-        position += 1
-    
-    return 0, ''.join(decimal_digits)
-
-def to_base(num, base):
-    """Convert integer to given base, return string representation"""
-    if num == 0:
-        return "0"
-    digits = []
-    while num:
-        digits.append(str(num % base))
-        num //= base
-    return ''.join(reversed(digits))
-
-def multiplicative_order(base, n):
-    """Calculate ord_n(base) - multiplicative order"""
-    if math.gcd(base, n) != 1:
-        # Handle non-coprime case
-        temp_n = n
-        while math.gcd(temp_n, base) > 1:
-            g = math.gcd(temp_n, base)
-            temp_n //= g
-        if temp_n == 1:
-            return 0  # Terminates
-        n = temp_n
-    
-    order = 1
-    remainder = base % n
-    while remainder != 1:
-        remainder = (remainder * base) % n
-        order += 1
-        if order > n:  # Safety
-            return -1
-    return order
-
 # ============================================================================
 # VERIFICATION TESTS
 # ============================================================================